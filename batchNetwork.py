@@ -0,0 +1,99 @@
+import numpy as np
+from genome import Genome
+from neuralNet import NeuralNetwork
+
+class BatchNetwork:
+    """
+    Class that stacks the neural networks of a whole population so that all of them can be fed forward at once.
+    Every level of every network is stored in one array, so a single vectorized pass per level replaces the
+    per car loops of Level.feed_forward while keeping the same rule of turning a neuron on if its sum is bigger than its bias
+
+    Args:
+        networks (list): The neural networks of the population, all with the same neuron counts
+
+    Attributes:
+        weights (list): The weights of each level as an array of shape (networks, inputs, outputs)
+        biases (list): The biases of each level as an array of shape (networks, outputs)
+        activations (list): The inputs of each level followed by the final outputs from the last feed forward
+    """
+
+    def __init__(self, networks):
+        self.weights = []
+        self.biases = []
+        self.activations = []
+
+        if networks:
+            BatchNetwork.set_genomes(self, np.stack([network.parameters for network in networks]), NeuralNetwork.get_neuron_counts(networks[0]))
+
+    def set_genomes(batch, genomes, neuron_counts):
+        """
+        Takes the levels of every network from a genome matrix, whose columns already are the stacked levels
+
+        Args:
+            batch (BatchNetwork): The batch receiving the networks
+            genomes (array): The flat parameters of every network with shape (networks, parameters)
+            neuron_counts (list): The neuron counts shared by all networks
+        """
+
+        batch.weights = []
+        batch.biases = []
+        for biases, weights, shape in Genome.get_level_slices(neuron_counts):
+            batch.weights.append(genomes[:, weights].reshape(len(genomes), *shape))
+            batch.biases.append(genomes[:, biases])
+
+    def feed_forward(given_inputs, batch):
+        """
+        Feeds forward the signals of every network in one pass per level
+
+        Args:
+            given_inputs (array): The inputs of every network with shape (networks, inputs), in our case; The offsets detected from the sensors
+            batch (BatchNetwork): The stacked networks being used to feed forward the info
+
+        Returns:
+            array: The binary outputs of every network with shape (networks, outputs)
+        """
+
+        outputs = np.asarray(given_inputs, dtype=np.float64)
+        batch.activations = [outputs]
+
+        for weights, biases in zip(batch.weights, batch.biases):
+            # (networks, 1, inputs) @ (networks, inputs, outputs) sums the weighted signals of every network at once
+            sums = np.matmul(outputs[:, np.newaxis, :], weights)[:, 0, :]
+            outputs = (sums > biases).astype(np.float64) # Turn on the output neurons where the sum of the signals is bigger than the bias
+            batch.activations.append(outputs)
+
+        return outputs
+
+    def select(batch, rows):
+        """
+        Creates a smaller batch holding only the given networks, e.g. the agents that have not crashed yet
+
+        Args:
+            batch (BatchNetwork): The stacked networks to select from
+            rows (array): The indices of the networks to keep
+
+        Returns:
+            BatchNetwork: The stacked networks of the given rows
+        """
+
+        selected = BatchNetwork([])
+        selected.weights = [weights[rows] for weights in batch.weights]
+        selected.biases = [biases[rows] for biases in batch.biases]
+        return selected
+
+    def write_back(batch, index, network):
+        """
+        Copies the inputs and outputs of one network from the last feed forward into its levels, so it can be visualized
+
+        Args:
+            batch (BatchNetwork): The stacked networks that were fed forward
+            index (int): The index of the network in the batch
+            network (NeuralNetwork): The network receiving the values
+        """
+
+        if not batch.activations:
+            return
+
+        for i, level in enumerate(network.levels):
+            level.inputs = batch.activations[i][index].tolist()
+            level.outputs = [int(value) for value in batch.activations[i+1][index]]
@@ -0,0 +1,222 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Runs without a display
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import numpy as np
+from car import Car
+from genome import Genome
+from scenario import create_road, generate_cars, generate_traffic
+from neuralNet import NeuralNetwork
+from simulation import Simulation
+from utils import Utils
+
+def time_function(function, number=1000, repeat=5):
+    """
+    Times a function the way timeit does, taking the best of several rounds to leave out noise from other processes
+
+    Args:
+        function (function): The function to time, called without arguments
+        number (int): The amount of calls per round; by default 1000
+        repeat (int): The amount of rounds; by default 5
+
+    Returns:
+        float: The seconds a single call took in the fastest round
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+def create_dense_traffic(road, count, seed=0):
+    """
+    Creates the fixed traffic scenario and adds traffic cars ahead of the agents until there are count cars
+
+    Args:
+        road (Road): The road of the simulation
+        count (int): The amount of traffic cars
+        seed (int): Seed of the positions of the added cars; by default 0
+
+    Returns:
+        list: The traffic cars
+    """
+
+    traffic = generate_traffic(road)[:count]
+    generator = random.Random(seed)
+    for i in range(count - len(traffic)):
+        traffic.append(Car(road.get_lane_center(i % 3, 30), 400 - 60*(i//3) - generator.uniform(0, 40), 30, 50, "DUMMY"))
+    return traffic
+
+def run_micro_benchmarks():
+    """
+    Times the single functions of the simulation hot paths on a typical car in the default scenario. Every call
+    gets the state the hot path sees in the simulation: the moving car accelerates and steers, every polygon is
+    created for a pose that is not in the pose table yet, and every mutation gets a network that still shares
+    the read only parameters of the saved model
+
+    Returns:
+        dict: The seconds per call, keyed by the name of the function
+    """
+
+    road = create_road()
+    car = generate_cars(0, road, "AGENT")[0]
+    traffic = generate_traffic(road)
+    car.polygon = car.create_polygon()
+    for traffic_car in traffic:
+        traffic_car.polygon = traffic_car.create_polygon()
+
+    network = NeuralNetwork([car.sensor.ray_count, 6, 4])
+    inputs = [0.5 for _ in range(car.sensor.ray_count)]
+    segment = ({"x": 0, "y": 0}, {"x": 100, "y": 100}, {"x": 0, "y": 100}, {"x": 100, "y": 0})
+
+    # A car that keeps driving a circle, so the speed and angle change on every call
+    driver = generate_cars(0, road, "AGENT")[0]
+    driver.controls.forward = True
+    driver.controls.left = True
+
+    # Fractional angles never repeat, so every call calculates its corners instead of finding them in the pose table
+    posed = generate_cars(0, road, "AGENT")[0]
+    def create_new_pose():
+        posed.angle += 0.001
+        return posed.create_polygon()
+
+    # Every mutation makes its network private first, like the agents loaded from the model registry
+    shared = network.parameters.copy()
+    shared.flags.writeable = False
+    neuron_counts = NeuralNetwork.get_neuron_counts(network)
+    mutations, rounds = 2000, 5
+    unmutated = iter([NeuralNetwork(neuron_counts, shared) for _ in range(mutations * rounds)])
+
+    return {
+        'Utils.get_intersection': time_function(lambda: Utils.get_intersection(*segment), 20000),
+        'Utils.polys_intersect': time_function(lambda: Utils.polys_intersect(car.polygon, traffic[2].polygon), 5000),
+        'Car.create_polygon': time_function(create_new_pose, 20000),
+        'Car.move': time_function(driver.move, 20000),
+        'Sensor.update': time_function(lambda: car.sensor.update(road.borders, traffic), 500),
+        'NeuralNetwork.feed_forward': time_function(lambda: NeuralNetwork.feed_forward(inputs, network), 5000),
+        'NeuralNetwork.mutate': time_function(lambda: NeuralNetwork.mutate(next(unmutated), 0.1), mutations, rounds)
+    }
+
+def run_frame_benchmark(agents, traffic_count, frames=50, warmup=5, repeat=3, batched=True):
+    """
+    Times whole headless frames of a simulation. The networks and traffic are seeded so every run simulates the same,
+    and the fastest of several runs is taken
+
+    Args:
+        agents (int): The amount of agent cars
+        traffic_count (int): The amount of traffic cars
+        frames (int): The amount of timed frames; by default 50
+        warmup (int): The amount of frames simulated before timing; by default 5
+        repeat (int): The amount of runs; by default 3
+        batched (bool): If the simulation runs batched, see Simulation; by default True
+
+    Returns:
+        float: The average seconds per frame
+        int: The amount of agent steps in the timed frames
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        random.seed(0)
+        Genome.seed(0)
+        road = create_road()
+        simulation = Simulation(road, generate_cars(agents-1, road, "AGENT"), create_dense_traffic(road, traffic_count), batched)
+
+        for _ in range(warmup):
+            simulation.step()
+
+        steps = simulation.agent_steps
+        start = time.perf_counter()
+        for _ in range(frames):
+            simulation.step()
+        best = min(best, (time.perf_counter() - start) / frames)
+    return best, simulation.agent_steps - steps
+
+def run_benchmarks(populations=(50, 500, 5000), densities=(13, 50, 200), frames=50):
+    """
+    Runs the micro benchmarks and the frame benchmarks for every population size and traffic density
+
+    Args:
+        populations (tuple): The amounts of agent cars; by default (50, 500, 5000)
+        densities (tuple): The amounts of traffic cars; by default (13, 50, 200)
+        frames (int): The amount of timed frames per frame benchmark; by default 50
+
+    Returns:
+        dict: The environment the results were taken in and the seconds of every benchmark, keyed by its name
+    """
+
+    results = run_micro_benchmarks()
+    for agents in populations:
+        for traffic_count in densities:
+            seconds, steps = run_frame_benchmark(agents, traffic_count, frames)
+            results[f'frame[agents={agents},traffic={traffic_count},frames={frames}]'] = seconds
+            print(f"{agents} agents, {traffic_count} traffic: {seconds*1000:.2f} ms/frame, {steps/(seconds*frames):.0f} agent-steps/s")
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        'results': results
+    }
+
+def compare(report, baseline, threshold=0.2):
+    """
+    Compares results against a baseline and prints every benchmark with its change
+
+    Args:
+        report (dict): The report created by run_benchmarks
+        baseline (dict): A report stored earlier
+        threshold (float): The relative slowdown above which a benchmark counts as regressed; by default 0.2 (20%)
+
+    Returns:
+        list: The names of the benchmarks that regressed
+    """
+
+    regressions = []
+    for name, seconds in report['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name}: {seconds*1e6:.2f} us (new)")
+            continue
+
+        change = seconds / before - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name}: {before*1e6:.2f} us -> {seconds*1e6:.2f} us ({change:+.1%}){' REGRESSION' if regressed else ''}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths without a display")
+    parser.add_argument("--output", default="benchmark.json", help="The json file the results are written to")
+    parser.add_argument("--baseline", default=None, help="A json file of earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--populations", type=int, nargs="+", default=[50, 500, 5000], help="Amounts of agent cars")
+    parser.add_argument("--densities", type=int, nargs="+", default=[13, 50, 200], help="Amounts of traffic cars")
+    parser.add_argument("--frames", type=int, default=50, help="Timed frames per frame benchmark")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.populations, args.densities, args.frames)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to '{args.output}'.")
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
@@ -1,4 +1,5 @@
 import pygame
+from textCache import TextCache
 
 class Button:
     """
@@ -19,6 +20,8 @@ class Button:
         width (int): The width of the button
         height (int): The height of the button
         callback (method): The method hooked to the button
+        color (tuple): The color the button is drawn in next, green for one frame after it was clicked
+        drawn_color (tuple): The color the button was drawn in the last time, None if it was not drawn yet
     """
 
     def __init__(self, text, x, y, width, height, callback):
@@ -26,6 +29,7 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)
         self.callback = callback
         self.color = (200, 200, 200)
+        self.drawn_color = None
 
     def draw(self, screen):
         """
@@ -33,13 +37,19 @@ class Button:
 
         Args:
             screen (Surface): The surface to draw on
+
+        Returns:
+            list: The rectangle of the button if it looks different than at the last draw
         """
         pygame.draw.rect(screen, self.color, self.rect)
-        font = pygame.font.Font(None, 36)
-        text_surf = font.render(self.text, True, (0, 0, 0))
+        text_surf = TextCache.render(self.text, 36, (0, 0, 0))
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
+
+        rects = [] if self.color == self.drawn_color else [self.rect]
+        self.drawn_color = self.color
         self.color = (200, 200, 200)
+        return rects
 
     def handle_event(self, event):
         """
@@ -4,6 +4,7 @@ from sensor import Sensor
 from utils import Utils
 from controls import Controls
 from neuralNet import NeuralNetwork
+from poseTable import PoseTable
 
 class Car:
     """
@@ -65,7 +66,7 @@ class Car:
                 [self.sensor.ray_count, 6, 4]
             )
 
-    def update(self, road_borders, traffic):
+    def update(self, road_borders, traffic, batched=False):
         """
         Updates the car on every frame by checking if it is damaged and if not then creating its polygon and moving it.
         If the car has sensors then it also updates its sensors on every frame as well as sending the
@@ -74,6 +75,7 @@ class Car:
         Args:
             road_borders (list): List of the borders on the road
             traffic (list): List of the traffic cars on the road
+            batched (bool): If the sensing and the network of the car are handled for the whole population by the Simulation; by default False
         """
 
         if not self.damaged:
@@ -83,22 +85,44 @@ class Car:
         else:
             self.polygon = self.create_polygon()
             self.speed = 0
-        self.controls.handle_controls()
 
-        if hasattr(self, 'sensor'):
+        # Agents get their controls from the network below, so the keyboard only needs to be read for the other cars.
+        # This also keeps the update independent of the pygame display for headless runs
+        if not self.use_brain:
+            self.controls.handle_controls()
+
+        if hasattr(self, 'sensor') and not batched:
             self.sensor.update(road_borders, traffic)
 
-            # Get the offsets and send them as signals to the neural network
-            offsets = [0 if x is None else 1 - x["offset"] for x in self.sensor.detections] # If object is far away, neurons receive low values and higher values close to 1 if the object is close 
             # Feed forward the signals and receive proper outputs to control the car
-            outputs = NeuralNetwork.feed_forward(offsets, self.brain)
+            outputs = NeuralNetwork.feed_forward(self.get_sensor_inputs(), self.brain)
+            self.apply_outputs(outputs)
 
-            # If the car is an agent then control the car using the received outputs from the NN
-            if self.use_brain:
-                self.controls.forward = outputs[0]
-                self.controls.left = outputs[1]
-                self.controls.right = outputs[2]
-                self.controls.reverse = outputs[3]
+    def get_sensor_inputs(self):
+        """
+        Turns the current detections of the sensor into the signals for the neural network
+
+        Returns:
+            list: The signal of every ray
+        """
+
+        # Get the offsets and send them as signals to the neural network
+        return [0 if x is None else 1 - x["offset"] for x in self.sensor.detections] # If object is far away, neurons receive low values and higher values close to 1 if the object is close
+
+    def apply_outputs(self, outputs):
+        """
+        Controls the car using the outputs of the neural network
+
+        Args:
+            outputs (list): The output values of the network (W, A, D, S)
+        """
+
+        # If the car is an agent then control the car using the received outputs from the NN
+        if self.use_brain:
+            self.controls.forward = outputs[0]
+            self.controls.left = outputs[1]
+            self.controls.right = outputs[2]
+            self.controls.reverse = outputs[3]
 
     def check_damaged(self, road_borders, traffic):
         """
@@ -114,10 +138,10 @@ class Car:
         """
 
         for border in road_borders:
-            if Utils.polys_intersect(self.polygon, border):
+            if Utils.boxes_intersect(self.polygon, border):
                 return True
         for traffic_car in traffic:
-            if Utils.polys_intersect(self.polygon, traffic_car.polygon):
+            if Utils.boxes_intersect(self.polygon, traffic_car.polygon):
                 return True
         return False
 
@@ -129,31 +153,14 @@ class Car:
             list: The corner points of the car polygon
         """
 
-        points = []
-        rad = math.hypot(self.width, self.height)/2 # Since the car is a rectangle we can simply get the hypothenuse and half it to get the "radius" from the center to each corner
-        alpha = math.atan2(self.width, self.height) 
-
         # The x and v values of the cars position when creating in pygame are not centered so we center it here seperately to make calculations easier
         x_center = self.x + self.width/2
         y_center = self.y + self.height/2
 
-        points.append(
-            {"x":x_center - math.sin(math.radians(self.angle)-alpha)*rad, 
-             "y":y_center - math.cos(math.radians(self.angle)-alpha)*rad}
-        )
-        points.append(
-            {"x":x_center - math.sin(math.radians(self.angle)+alpha)*rad, 
-             "y":y_center - math.cos(math.radians(self.angle)+alpha)*rad}
-        )
-        points.append(
-            {"x":x_center - math.sin(math.pi+math.radians(self.angle)-alpha)*rad, 
-             "y":y_center - math.cos(math.pi+math.radians(self.angle)-alpha)*rad}
-        )
-        points.append(
-            {"x":x_center - math.sin(math.pi+math.radians(self.angle)+alpha)*rad, 
-             "y":y_center - math.cos(math.pi+math.radians(self.angle)+alpha)*rad}
-        )
-        return points
+        # The corner offsets only depend on the size and angle of the car so they are looked up instead of recalculated
+        return [
+            {"x":x_center + dx, "y":y_center + dy} for dx, dy in PoseTable.get_corners(self.width, self.height, self.angle)
+        ]
         
     def draw(self, screen, new_color, draw_sensor=False):
         '''
@@ -167,11 +174,13 @@ class Car:
         if self.damaged:
             color = (255, 0, 0, 128)
     
+        # Read once, the polygon of a car view in a batched population is built anew on every read
+        polygon = self.polygon
         poly_points = [
-            (self.polygon[0]["x"], self.polygon[0]["y"]), 
-            (self.polygon[1]["x"], self.polygon[1]["y"]),
-            (self.polygon[2]["x"], self.polygon[2]["y"]),
-            (self.polygon[3]["x"], self.polygon[3]["y"])
+            (polygon[0]["x"], polygon[0]["y"]), 
+            (polygon[1]["x"], polygon[1]["y"]),
+            (polygon[2]["x"], polygon[2]["y"]),
+            (polygon[3]["x"], polygon[3]["y"])
             ]
         
         pygame.draw.polygon(screen, color, poly_points) 
@@ -0,0 +1,149 @@
+import math
+import numpy as np
+import pygame
+from dirtyRegions import DirtyRegions
+
+class CarRenderer:
+    """
+    Class that draws the cars of a simulation so the cost of rendering does not grow with the population.
+    Cars outside the visible part of the screen are skipped, and once more agents are visible than the budget allows
+    only representatives of them are drawn, or a density heatmap in their place. Agents that stand in the same cell
+    look alike, so one of them is picked per cell before the rest is thinned out evenly. The best car is always drawn in full along with its sensor
+
+    Args:
+        max_agents (int): The amount of agents besides the best car that are drawn as cars at most; by default 100
+        heatmap (bool): If a density heatmap is drawn in place of the agents once there are too many; by default False
+        cell_size (int): The size of the cells in pixels the agents are grouped in, for the representatives and the heatmap; by default 8
+
+    Attributes:
+        max_agents (int): The amount of agents besides the best car that are drawn as cars at most
+        heatmap (bool): If a density heatmap is drawn in place of the agents once there are too many
+        cell_size (int): The size of the cells in pixels the agents are grouped in
+    """
+
+    def __init__(self, max_agents=100, heatmap=False, cell_size=8):
+        self.max_agents = max_agents
+        self.heatmap = heatmap
+        self.cell_size = cell_size
+
+    def draw(self, screen, simulation, view):
+        """
+        Draws the visible traffic, the agents within the budget and the best car with its sensor
+
+        Args:
+            screen (Surface): The surface to draw on
+            simulation (Simulation): The simulation whose cars are drawn
+            view (Rect): The visible part of the screen
+
+        Returns:
+            list: The rectangles of the screen that were drawn on
+        """
+
+        view = pygame.Rect(view)
+        bounds = view.inflate(4, 4) # Polygons ending less than a pixel outside the view still touch its edge pixels
+        traffic_polygons, agent_polygons = simulation.get_polygons()
+
+        visible = np.flatnonzero(CarRenderer.get_visible(traffic_polygons, bounds))
+        for i in visible.tolist():
+            simulation.traffic[i].draw(screen, (0, 0, 255,0))
+        rects = DirtyRegions.get_bounding_rects(traffic_polygons[visible])
+
+        # The first car is only drawn when it is the best one and the best car is drawn last, on top of the others
+        shown = CarRenderer.get_visible(agent_polygons, bounds)
+        shown[[0, simulation.best_index]] = False
+        indices = np.flatnonzero(shown)
+
+        if len(indices) > self.max_agents and self.heatmap:
+            rects += self.draw_heatmap(screen, agent_polygons[indices], view)
+        else:
+            if len(indices) > self.max_agents:
+                indices = self.select_agents(agent_polygons, indices)
+            for i in indices.tolist():
+                simulation.cars[i].draw(screen, (255, 255, 0, 150))
+            rects += DirtyRegions.get_bounding_rects(agent_polygons[indices])
+
+        best_car = simulation.best_car
+        best_car.draw(screen, (0, 255, 0), True)
+        rects += DirtyRegions.get_bounding_rects(agent_polygons[[simulation.best_index]])
+        if best_car.sensor.rays:
+            rects += DirtyRegions.get_bounding_rects([[(point["x"], point["y"]) for ray in best_car.sensor.rays for point in ray]])
+
+        return rects
+
+    def get_visible(polygons, view):
+        """
+        Checks which polygons overlap the visible part of the screen
+
+        Args:
+            polygons (array): The corner points of the cars with shape (cars, corners, 2)
+            view (Rect): The visible part of the screen
+
+        Returns:
+            array: For every car True if it is at least partly visible
+        """
+
+        if len(polygons) == 0:
+            return np.zeros(0, dtype=bool)
+
+        lower = polygons.min(axis=1)
+        upper = polygons.max(axis=1)
+        return (upper[:, 0] >= view.left) & (lower[:, 0] < view.right) & (upper[:, 1] >= view.top) & (lower[:, 1] < view.bottom)
+
+    def select_agents(self, polygons, indices):
+        """
+        Picks the agents that represent all visible agents: one per cell, thinned out evenly if there are still too many
+
+        Args:
+            polygons (array): The corner points of all agents with shape (agents, corners, 2)
+            indices (array): The indices of the visible agents, in drawing order
+
+        Returns:
+            array: The indices of at most max_agents agents, in drawing order
+        """
+
+        cells = np.floor(polygons[indices].mean(axis=1) / self.cell_size).astype(np.int64)
+        _, first = np.unique(cells, axis=0, return_index=True)
+        representatives = indices[np.sort(first)]
+
+        if len(representatives) > self.max_agents:
+            representatives = representatives[np.linspace(0, len(representatives) - 1, self.max_agents).astype(np.int64)]
+        return representatives
+
+    def draw_heatmap(self, screen, polygons, view):
+        """
+        Draws how many agents are in each cell of the visible part of the screen, more agents being more opaque
+
+        Args:
+            screen (Surface): The surface to draw on
+            polygons (array): The corner points of the agents with shape (agents, corners, 2)
+            view (Rect): The visible part of the screen
+
+        Returns:
+            list: The rectangle of the screen that was drawn on, empty if no agent is in the view
+        """
+
+        columns = math.ceil(view.width / self.cell_size)
+        rows = math.ceil(view.height / self.cell_size)
+
+        cells = np.floor((polygons.mean(axis=1) - view.topleft) / self.cell_size).astype(np.int64)
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < columns) & (cells[:, 1] >= 0) & (cells[:, 1] < rows)
+        if not inside.any():
+            return []
+
+        counts = np.zeros((columns, rows), dtype=np.int64)
+        np.add.at(counts, (cells[inside, 0], cells[inside, 1]), 1)
+
+        # Only the cells between the outermost agents are drawn
+        occupied = np.argwhere(counts)
+        (left, top), (right, bottom) = occupied.min(axis=0), occupied.max(axis=0) + 1
+        counts = counts[left:right, top:bottom]
+
+        # A logarithmic scale keeps single agents visible next to cells holding hundreds of them
+        heatmap = pygame.Surface(counts.shape, pygame.SRCALPHA)
+        heatmap.fill((255, 255, 0, 0))
+        alpha = pygame.surfarray.pixels_alpha(heatmap)
+        alpha[...] = np.where(counts > 0, 80 + 175*np.log1p(counts)/np.log1p(counts.max()), 0).astype(np.uint8)
+        del alpha # Unlocks the surface
+
+        heatmap = pygame.transform.scale(heatmap, (counts.shape[0]*self.cell_size, counts.shape[1]*self.cell_size))
+        return [screen.blit(heatmap, (view.left + left*self.cell_size, view.top + top*self.cell_size))]
@@ -0,0 +1,206 @@
+import glob
+import os
+import queue
+import stat
+import tempfile
+import threading
+import numpy as np
+from modelFile import ModelFile
+from neuralNet import NeuralNetwork
+
+class Checkpointer:
+    """
+    Writes models to disk on a background thread so saving never stalls the game loop. The parameters are copied
+    in memory right away and written later, every file is first written to a temporary file next to it and then
+    renamed over the target so a crash never leaves a half written model behind. Besides saving single models
+    on request it can save the whole population every few generations, keeping a rolling history of them.
+    The generations are numbered on from the newest checkpoint already in the directory, so a new run never
+    overwrites the history of an earlier one or is taken for older than it
+
+    Args:
+        directory (str): The directory the generation checkpoints are written to; by default "checkpoints"
+        keep (int): The amount of generation checkpoints kept, older ones are deleted; by default 5
+        every (int): The amount of generations between automatic checkpoints; by default None to turn them off
+
+    Attributes:
+        directory (str): The directory the generation checkpoints are written to
+        keep (int): The amount of generation checkpoints kept
+        every (int): The amount of generations between automatic checkpoints
+        first_generation (int): The number the first generation of this run is saved as
+        jobs (Queue): The writes and deletes that are waiting for the background thread
+        thread (Thread): The background thread writing the files
+    """
+
+    def __init__(self, directory="checkpoints", keep=5, every=None):
+        self.directory = directory
+        self.keep = keep
+        self.every = every
+        latest = Checkpointer.latest(directory)
+        self.first_generation = Checkpointer.get_generation(latest) + 1 if latest is not None else 0
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def save_model(self, network, file_path):
+        """
+        Saves a single network, as json or in the binary format if the path ends with ModelFile.extension.
+        Used by the "Save Model" button instead of NeuralNetwork.save_model
+
+        Args:
+            network (NeuralNetwork): The network to save, e.g. the brain of the best car
+            file_path (str): Path of the file that stores the model
+        """
+
+        self.jobs.put((file_path, np.array(network.parameters), NeuralNetwork.get_neuron_counts(network), "Saved model!"))
+
+    def delete_model(self, file_path):
+        """
+        Deletes a saved model once the saves queued before are written, so a pending save does not bring it back.
+        Used by the "Delete Model" button instead of NeuralNetwork.delete_model
+
+        Args:
+            file_path (str): Path of the file that stores the model
+        """
+
+        self.jobs.put((file_path, None, None, None))
+
+    def save_generation(self, generation, genomes, neuron_counts):
+        """
+        Saves the networks of a whole generation as a versioned binary checkpoint in the directory
+
+        Args:
+            generation (int): The number of the generation, part of the file name
+            genomes (array): The flat parameters of every network with shape (networks, parameters), the best first
+            neuron_counts (list): The neuron counts shared by all networks
+        """
+
+        file_path = os.path.join(self.directory, f"generation-{generation:06d}{ModelFile.extension}")
+        self.jobs.put((file_path, np.array(genomes), list(neuron_counts), None))
+
+    def on_generation_end(self, generation, networks):
+        """
+        Saves the generation if an automatic checkpoint is due, numbered on from the checkpoints of earlier runs
+
+        Args:
+            generation (int): The number of the generation that ended, counted from 0 in this run
+            networks (list): The networks of the generation, the best first
+        """
+
+        if self.every is None or (generation+1) % self.every != 0:
+            return
+        genomes = np.stack([network.parameters for network in networks])
+        self.save_generation(self.first_generation + generation, genomes, NeuralNetwork.get_neuron_counts(networks[0]))
+
+    def run(self):
+        """
+        Writes or deletes the queued models one after another, the job of the background thread
+        """
+
+        while True:
+            file_path, genomes, neuron_counts, message = self.jobs.get()
+            try:
+                if genomes is None:
+                    NeuralNetwork.delete_model(file_path)
+                    continue
+                Checkpointer.write(file_path, genomes, neuron_counts)
+                if os.path.dirname(os.path.abspath(file_path)) == os.path.abspath(self.directory):
+                    self.remove_old()
+                if message is not None:
+                    print(message)
+            except Exception as e: # Any error would end the thread and leave flush waiting forever
+                print(f"An error occurred while saving '{file_path}': {e}")
+            finally:
+                self.jobs.task_done()
+
+    def write(file_path, genomes, neuron_counts):
+        """
+        Writes a model atomically by writing a temporary file in the same directory and renaming it
+
+        Args:
+            file_path (str): Path of the file that stores the model
+            genomes (array): The flat parameters of one network or of many
+            neuron_counts (list): The neuron counts shared by all networks
+        """
+
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(file_path)[1])
+        os.close(descriptor)
+        try:
+            if ModelFile.is_binary(file_path):
+                ModelFile.save(temp_path, genomes, neuron_counts)
+            else:
+                ModelFile.write_json(temp_path, np.atleast_2d(genomes)[0], neuron_counts)
+
+            with open(temp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            # Temporary files are only readable by their owner, the model gets the mode a plain write would give it
+            os.chmod(temp_path, Checkpointer.get_mode(file_path))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def get_mode(file_path):
+        """
+        Gets the permissions a model file is written with: those of the file it replaces, otherwise the default
+        permissions of a new file under the umask
+
+        Args:
+            file_path (str): Path of the file that stores the model
+
+        Returns:
+            int: The permission bits
+        """
+
+        try:
+            return stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def remove_old(self):
+        """
+        Deletes the generation checkpoints beyond the amount that is kept, the oldest first
+        """
+
+        paths = sorted(glob.glob(os.path.join(self.directory, f"generation-*{ModelFile.extension}")))
+        for path in paths[:max(len(paths) - self.keep, 0)]:
+            os.remove(path)
+
+    def latest(directory="checkpoints"):
+        """
+        Finds the newest generation checkpoint in a directory
+
+        Args:
+            directory (str): The directory of the checkpoints; by default "checkpoints"
+
+        Returns:
+            str: The path of the newest checkpoint, None if there is none
+        """
+
+        paths = sorted(glob.glob(os.path.join(directory, f"generation-*{ModelFile.extension}")))
+        return paths[-1] if paths else None
+
+    def get_generation(file_path):
+        """
+        Reads the number of the generation from the name of a generation checkpoint
+
+        Args:
+            file_path (str): Path of the checkpoint, e.g. "checkpoints/generation-000009.sdcm"
+
+        Returns:
+            int: The number of the generation
+        """
+
+        name = os.path.basename(file_path)
+        return int(name[len("generation-"):-len(ModelFile.extension)])
+
+    def flush(self):
+        """
+        Waits until every queued model is written, e.g. before the program exits
+        """
+
+        self.jobs.join()
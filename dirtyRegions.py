@@ -0,0 +1,89 @@
+import numpy as np
+import pygame
+
+class DirtyRegions:
+    """
+    Collects the parts of the screen that changed in a frame, so only those are pushed to the display with
+    pygame.display.update instead of flipping the whole screen. Objects that move, like the cars and the sensor rays,
+    are pushed where they are now and once more in the next frame, so the place they left is cleared as well
+
+    Args:
+        bounds (Rect): The rectangle of the screen
+
+    Attributes:
+        bounds (Rect): The rectangle of the screen, every region is clipped to it
+        rects (list): The changed regions of the current frame
+        moving (list): The regions of the current frame that are pushed again in the next frame
+        previous (list): The regions of the moving objects from the last frame
+        full (bool): If the whole screen is pushed in the current frame, e.g. the first one
+    """
+
+    def __init__(self, bounds):
+        self.bounds = pygame.Rect(bounds)
+        self.rects = []
+        self.moving = []
+        self.previous = []
+        self.full = True
+
+    def add(self, rects):
+        """
+        Marks regions that changed in the current frame
+
+        Args:
+            rects (list): The changed rectangles
+        """
+
+        self.rects.extend(rects)
+
+    def add_moving(self, rects):
+        """
+        Marks regions of objects that are drawn in a different place in the next frame
+
+        Args:
+            rects (list): The rectangles the objects cover in the current frame
+        """
+
+        self.moving.extend(rects)
+
+    def get_bounding_rects(points, margin=2):
+        """
+        Gets the rectangles around groups of points, e.g. the corner points of the cars
+
+        Args:
+            points (array): The points of every group with shape (groups, points, 2)
+            margin (int): The pixels added on every side, covering the width of lines and antialiasing; by default 2
+
+        Returns:
+            list: The rectangle around every group
+        """
+
+        points = np.asarray(points, dtype=np.float64)
+        if len(points) == 0:
+            return []
+
+        lower = np.floor(points.min(axis=1)).astype(np.int64) - margin
+        upper = np.ceil(points.max(axis=1)).astype(np.int64) + margin
+        return [pygame.Rect(left, top, right - left, bottom - top) for (left, top), (right, bottom) in zip(lower.tolist(), upper.tolist())]
+
+    def invalidate(self):
+        """
+        Makes the next update push the whole screen, e.g. after something was drawn that is not tracked
+        """
+
+        self.full = True
+
+    def update(self):
+        """
+        Pushes the changed regions of the current frame and of the moving objects of the last frame to the display
+        """
+
+        if self.full:
+            pygame.display.flip()
+        else:
+            rects = [rect.clip(self.bounds) for rect in self.rects + self.moving + self.previous]
+            pygame.display.update([rect for rect in rects if rect.width and rect.height]) # Regions off the screen are left out
+
+        self.previous = self.moving
+        self.rects = []
+        self.moving = []
+        self.full = False
@@ -0,0 +1,171 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Keeps every worker process from printing the pygame greeting
+
+import argparse
+import hashlib
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from car import Car
+from fitnessCache import FitnessCache
+from genome import Genome
+from scenario import create_road, generate_cars, generate_traffic
+from neuralNet import NeuralNetwork
+from simulation import Simulation
+
+def evaluate_genomes(task):
+    """
+    Runs the road and traffic scenario without rendering for a chunk of agents. Used as the job of a worker process
+
+    Args:
+        task (tuple): The neuron counts of the networks, the genomes of the agents as a (agents, parameters) array
+            and the maximum amount of frames to simulate
+
+    Returns:
+        array: The distance every agent drove, the fitness behind picking the car with the smallest y value
+        array: The frame every agent crashed in, -1 if it never crashed
+    """
+
+    neuron_counts, genomes, frames = task
+
+    road = create_road()
+    cars = generate_cars(len(genomes)-1, road, "AGENT")
+    for car, genome in zip(cars, genomes):
+        if NeuralNetwork.get_neuron_counts(car.brain) != neuron_counts:
+            car.brain = NeuralNetwork(neuron_counts)
+        NeuralNetwork.set_parameters(car.brain, genome)
+
+    # Without the scroll the distances do not depend on which agents share a worker
+    simulation = Simulation(road, cars, generate_traffic(road), scroll=False)
+    while simulation.frame < frames and not simulation.all_damaged():
+        simulation.step()
+
+    crash_frames = [-1 if frame is None else frame for frame in simulation.crash_frames]
+    return np.array(simulation.get_distances()), np.array(crash_frames)
+
+def get_scenario_fingerprint(neuron_counts, frames):
+    """
+    Creates a fingerprint of everything besides the genome that decides the result of an evaluation,
+    so cached results are not used once the road, the cars, the traffic or the frame budget change
+
+    Args:
+        neuron_counts (list): The neuron counts shared by all networks
+        frames (int): The maximum amount of frames simulated
+
+    Returns:
+        str: The fingerprint of the scenario
+    """
+
+    road = create_road()
+    agent = generate_cars(0, road, "AGENT")[0]
+    cars = [agent] + generate_traffic(road)
+
+    scenario = {
+        'neuron_counts': list(neuron_counts),
+        'frames': frames,
+        'borders': road.borders,
+        'cars': [[car.x, car.y, car.width, car.height, car.control_type, car.max_speed, car.acceleration, car.friction, car.rotation_speed] for car in cars],
+        'sensor': [agent.sensor.ray_count, agent.sensor.ray_length, agent.sensor.ray_spread]
+    }
+    return hashlib.blake2b(json.dumps(scenario).encode(), digest_size=16).hexdigest()
+
+def evaluate_population(genomes, neuron_counts, frames=1000, executor=None, workers=None, cache=None):
+    """
+    Splits the genomes of a generation across a process pool and collects the results of every agent
+
+    Args:
+        genomes (array): The flat parameters of every agent with shape (agents, parameters)
+        neuron_counts (list): The neuron counts shared by all networks
+        frames (int): The maximum amount of frames to simulate; by default 1000
+        executor (ProcessPoolExecutor): The pool to run on; by default None to create one for this call
+        workers (int): The amount of worker processes; by default None to use every core
+        cache (FitnessCache): The results of genomes evaluated before, only the others are simulated; by default None
+
+    Returns:
+        array: The distance every agent drove
+        array: The frame every agent crashed in, -1 if it never crashed
+    """
+
+    if cache is not None:
+        return cache.evaluate(genomes, get_scenario_fingerprint(neuron_counts, frames),
+                              lambda missing: evaluate_population(missing, neuron_counts, frames, executor, workers))
+
+    if executor is None:
+        with ProcessPoolExecutor(workers) as executor:
+            return evaluate_population(genomes, neuron_counts, frames, executor, workers)
+
+    chunk_count = min(len(genomes), workers or os.cpu_count() or 1)
+    tasks = [(neuron_counts, chunk, frames) for chunk in np.array_split(genomes, chunk_count)]
+
+    results = list(executor.map(evaluate_genomes, tasks))
+    return np.concatenate([fitness for fitness, _ in results]), np.concatenate([crash_frames for _, crash_frames in results])
+
+def run_parallel(n=50, frames=1000, generations=1, workers=None, model_path="model.json", mutation=0.2, save=False, cache_size=10000, seed=None):
+    """
+    Trains the agents by evaluating every generation on a process pool. Each generation starts
+    from the best network of the previous one, the first one from the saved model if there is one
+
+    Args:
+        n (int): The amount of mutated agents per generation; by default 50
+        frames (int): The maximum amount of frames per generation; by default 1000
+        generations (int): The amount of generations; by default 1
+        workers (int): The amount of worker processes; by default None to use every core
+        model_path (str): Path of the json file that stores the model; by default "model.json"
+        mutation (float): The amount by which the agents are mutated; by default 0.2
+        save (bool): If the best network is saved to model_path at the end; by default False
+        cache_size (int): The amount of results kept to skip genomes evaluated before, 0 to turn it off; by default 10000
+        seed (int): Seed of the mutations to make the run repeatable; by default None
+
+    Returns:
+        NeuralNetwork: The best network of the last generation
+    """
+
+    Genome.seed(seed)
+    holder = Car(0, 0, 30, 50, "AGENT")
+    first_mutation = mutation
+    if os.path.exists(model_path):
+        NeuralNetwork.load_model(holder, model_path)
+    else:
+        first_mutation = 1 # Without a model every agent starts with random weights
+
+    parent = holder.brain
+    neuron_counts = NeuralNetwork.get_neuron_counts(parent)
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(workers) as executor:
+        for generation in range(generations):
+            generation_start = time.perf_counter()
+            genomes = Genome.create_generation(parent.parameters, n, first_mutation if generation == 0 else mutation)
+            fitness, crash_frames = evaluate_population(genomes, neuron_counts, frames, executor, workers, cache)
+
+            best = int(np.argmax(fitness))
+            NeuralNetwork.set_parameters(parent, genomes[best])
+
+            print(f"Generation {generation}: best distance {fitness[best]:.1f}, "
+                  f"{np.count_nonzero(crash_frames >= 0)}/{len(genomes)} crashed, {time.perf_counter() - generation_start:.2f}s")
+
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {generations} generations in {elapsed:.2f}s ({generations/elapsed*3600:.0f} generations/hour)")
+    if cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+
+    if save:
+        NeuralNetwork.save_model(holder, model_path)
+    return parent
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the agents on a pool of worker processes without a display")
+    parser.add_argument("--agents", type=int, default=50, help="Amount of mutated agents per generation")
+    parser.add_argument("--frames", type=int, default=1000, help="Maximum amount of frames per generation")
+    parser.add_argument("--generations", type=int, default=1, help="Amount of generations")
+    parser.add_argument("--workers", type=int, default=None, help="Amount of worker processes, every core by default")
+    parser.add_argument("--model", default="model.json", help="Path of the model to start from")
+    parser.add_argument("--mutation", type=float, default=0.2, help="Mutation amount of every generation")
+    parser.add_argument("--save", action="store_true", help="Save the best network to the model path at the end")
+    parser.add_argument("--cache-size", type=int, default=10000, help="Results kept to skip genomes evaluated before, 0 to turn it off")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the mutations to make the run repeatable")
+    args = parser.parse_args()
+
+    run_parallel(args.agents, args.frames, args.generations, args.workers, args.model, args.mutation, args.save, args.cache_size, args.seed)
@@ -0,0 +1,104 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+class FitnessCache:
+    """
+    Remembers the evaluation results of genomes, so networks that survive unchanged into the next generation
+    are not simulated again. Results are keyed by a hash of the flat parameters together with a fingerprint
+    of the scenario they were evaluated in, and the least recently used entries are dropped once the cache is full
+
+    Args:
+        max_size (int): The amount of results kept at most; by default 10000
+
+    Attributes:
+        max_size (int): The amount of results kept at most
+        entries (OrderedDict): The results keyed by genome and scenario, the least recently used first
+        hits (int): The amount of genomes whose result was found
+        misses (int): The amount of genomes that had to be evaluated
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(genome, fingerprint):
+        """
+        Creates the stable key of a genome in a scenario
+
+        Args:
+            genome (array): The flat parameters of a network, see NeuralNetwork.get_parameters
+            fingerprint (str): The fingerprint of the scenario
+
+        Returns:
+            str: The key of the genome
+        """
+
+        digest = hashlib.blake2b(np.ascontiguousarray(genome, dtype=np.float64).tobytes(), digest_size=16)
+        digest.update(fingerprint.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a result and marks it as recently used
+
+        Args:
+            key (str): The key of the genome
+
+        Returns:
+            tuple: The stored result, None if there is none
+        """
+
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        """
+        Stores a result, dropping the least recently used one if the cache is full
+
+        Args:
+            key (str): The key of the genome
+            result (tuple): The result of the genome
+        """
+
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def evaluate(self, genomes, fingerprint, evaluate):
+        """
+        Gets the results of many genomes, only passing the ones without a stored result on to be evaluated.
+        Genomes that occur more than once are evaluated once
+
+        Args:
+            genomes (array): The flat parameters of every agent with shape (agents, parameters)
+            fingerprint (str): The fingerprint of the scenario
+            evaluate (function): Evaluates an array of genomes and returns a tuple of arrays with a value per genome
+
+        Returns:
+            tuple: The arrays of results of every genome, in the same order as the genomes
+        """
+
+        keys = [FitnessCache.get_key(genome, fingerprint) for genome in genomes]
+        results = [self.get(key) for key in keys]
+
+        missing = {}
+        for i in range(len(keys)):
+            if results[i] is None:
+                missing.setdefault(keys[i], i)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            evaluated = evaluate(genomes[list(missing.values())])
+            found = {key: tuple(values[row] for values in evaluated) for row, key in enumerate(missing)}
+            for key, result in found.items():
+                self.put(key, result)
+            results = [found[keys[i]] if results[i] is None else results[i] for i in range(len(keys))]
+
+        return tuple(np.array(values) for values in zip(*results))
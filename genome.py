@@ -0,0 +1,118 @@
+import numpy as np
+
+class Genome:
+    """
+    Operations on the flat parameter arrays of neural networks. A genome holds the biases followed by the weights
+    of each level in one contiguous array, so mutating, randomizing and crossing over whole networks, or a matrix
+    of a whole population with one genome per row, are single array operations instead of loops over every value
+
+    Attributes:
+        generator (Generator): The random generator used by default, replaced by seed to make runs repeatable
+    """
+
+    generator = np.random.default_rng()
+
+    def seed(seed=None):
+        """
+        Replaces the default random generator, so the same seed creates the same networks and mutations
+
+        Args:
+            seed (int): The seed of the generator; by default None for a random one
+        """
+
+        Genome.generator = np.random.default_rng(seed)
+
+    def get_size(neuron_counts):
+        """
+        Calculates the amount of parameters of a network
+
+        Args:
+            neuron_counts (list): The amount of neurons of every layer
+
+        Returns:
+            int: The amount of biases and weights of all levels
+        """
+
+        return sum(neuron_counts[i+1] * (neuron_counts[i] + 1) for i in range(len(neuron_counts)-1))
+
+    def get_level_slices(neuron_counts):
+        """
+        Calculates where the biases and weights of each level are stored in a genome
+
+        Args:
+            neuron_counts (list): The amount of neurons of every layer
+
+        Returns:
+            list: The slice of the biases, the slice of the weights and the shape of the weights of every level
+        """
+
+        slices = []
+        position = 0
+        for i in range(len(neuron_counts)-1):
+            input_count, output_count = neuron_counts[i], neuron_counts[i+1]
+            biases = slice(position, position+output_count)
+            position += output_count
+            weights = slice(position, position+input_count*output_count)
+            position += input_count*output_count
+            slices.append((biases, weights, (input_count, output_count)))
+        return slices
+
+    def randomize(genomes, generator=None):
+        """
+        Sets every parameter to a random value between -1 and 1
+
+        Args:
+            genomes (array): A genome or a matrix of genomes, changed in place
+            generator (Generator): The random generator; by default None to use Genome.generator
+        """
+
+        generator = Genome.generator if generator is None else generator
+        genomes[...] = generator.uniform(-1, 1, genomes.shape)
+
+    def mutate(genomes, amount=1, generator=None):
+        """
+        Moves every parameter towards a random value between -1 and 1 by linear interpolation, like Utils.lerp
+
+        Args:
+            genomes (array): A genome or a matrix of genomes, changed in place
+            amount (float): The percent by how much the new values are going to differ; by default 1 (100%)
+            generator (Generator): The random generator; by default None to use Genome.generator
+        """
+
+        generator = Genome.generator if generator is None else generator
+        genomes += (generator.uniform(-1, 1, genomes.shape) - genomes)*amount
+
+    def crossover(first, second, rate=0.5, generator=None):
+        """
+        Creates children that take every parameter from one of two parents
+
+        Args:
+            first (array): A genome or a matrix of genomes of the first parents
+            second (array): The genomes of the second parents with the same shape
+            rate (float): The chance of a parameter being taken from the second parent; by default 0.5
+            generator (Generator): The random generator; by default None to use Genome.generator
+
+        Returns:
+            array: The genomes of the children
+        """
+
+        generator = Genome.generator if generator is None else generator
+        return np.where(generator.random(np.shape(first)) < rate, second, first)
+
+    def create_generation(parent, n, amount, generator=None):
+        """
+        Creates the genome matrix of a generation: the unchanged parent followed by n mutated copies of it
+
+        Args:
+            parent (array): The genome of the parent
+            n (int): The amount of mutated copies
+            amount (float): The amount by which the copies are mutated
+            generator (Generator): The random generator; by default None to use Genome.generator
+
+        Returns:
+            array: The genomes with shape (n+1, parameters)
+        """
+
+        genomes = np.repeat(np.asarray(parent, dtype=np.float64)[np.newaxis, :], n+1, axis=0)
+        Genome.mutate(genomes[1:], amount, generator)
+        return genomes
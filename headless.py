@@ -0,0 +1,97 @@
+import argparse
+import time
+from checkpointer import Checkpointer
+from metrics import TrainingMetrics
+from profiler import FrameProfiler
+from trainer import Trainer
+
+def run_headless(n=50, frames=1000, generations=1, model_path="model.json", mutation=0.2, batched=True,
+                 patience=None, stop_when_damaged=False, checkpoint_every=None, checkpoint_dir="checkpoints",
+                 metrics_port=None, metrics_file=None):
+    """
+    Runs the simulation without opening a window, drawing anything or limiting the frame rate.
+    The first generation loads the saved model like the game does, every following generation
+    starts from the brain of the previous best car and mutates it
+
+    Args:
+        n (int): The amount of agent cars; by default 50
+        frames (int): The amount of frames simulated per generation at most; by default 1000
+        generations (int): The amount of generations to simulate; by default 1
+        model_path (str): Path of the json file that stores the model; by default "model.json"
+        mutation (float): The amount by which the agents of a new generation are mutated; by default 0.2
+        batched (bool): If the networks of all agents are fed forward together; by default True
+        patience (int): The amount of frames without progress after which a generation ends early; by default None
+        stop_when_damaged (bool): If a generation ends early once every agent has crashed; by default False
+        checkpoint_every (int): The amount of generations between checkpoints of the population; by default None for none
+        checkpoint_dir (str): The directory the checkpoints are written to; by default "checkpoints"
+        metrics_port (int): Port the training metrics are served on in the Prometheus text format; by default None
+        metrics_file (str): Path of a rotating file the training metrics are written to; by default None
+
+    Returns:
+        dict: The total frames, agent steps, elapsed seconds and agent steps per second of the run
+    """
+
+    checkpointer = Checkpointer(checkpoint_dir, every=checkpoint_every) if checkpoint_every else None
+
+    profiler = None
+    metrics = None
+    if metrics_port is not None or metrics_file is not None:
+        profiler = FrameProfiler(measure=True)
+        metrics = TrainingMetrics(profiler=profiler)
+        if metrics_port is not None:
+            metrics.serve(metrics_port)
+        if metrics_file is not None:
+            metrics.write_to(metrics_file)
+
+    trainer = Trainer(n, model_path, mutation, frame_budget=frames, patience=patience, stop_when_damaged=stop_when_damaged,
+                      batched=batched, checkpointer=checkpointer, profiler=profiler, metrics=metrics)
+    total_frames = 0
+    total_steps = 0
+    start = time.perf_counter()
+
+    for generation in range(generations):
+        generation_start = time.perf_counter()
+        simulation = trainer.run_generation()
+        elapsed = time.perf_counter() - generation_start
+
+        crashed = sum(1 for car in simulation.cars if car.damaged)
+        print(f"Generation {generation}: best y {simulation.best_car.y:.1f}, {crashed}/{len(simulation.cars)} crashed, "
+              f"{simulation.agent_steps/elapsed:.0f} agent-steps/s")
+
+        total_frames += simulation.frame
+        total_steps += simulation.agent_steps
+
+    elapsed = time.perf_counter() - start
+    if checkpointer is not None:
+        checkpointer.flush()
+    if metrics is not None:
+        metrics.close()
+    print(f"Simulated {total_frames} frames and {total_steps} agent-steps in {elapsed:.2f}s "
+          f"({total_steps/elapsed:.0f} agent-steps/s, {total_frames/elapsed:.0f} frames/s)")
+
+    return {
+        'frames': total_frames,
+        'agent_steps': total_steps,
+        'seconds': elapsed,
+        'agent_steps_per_second': total_steps/elapsed
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the self driving car simulation without a display")
+    parser.add_argument("--agents", type=int, default=50, help="Amount of agent cars")
+    parser.add_argument("--frames", type=int, default=1000, help="Frames simulated per generation at most")
+    parser.add_argument("--generations", type=int, default=1, help="Amount of generations to simulate")
+    parser.add_argument("--model", default="model.json", help="Path of the model to start from")
+    parser.add_argument("--mutation", type=float, default=0.2, help="Mutation amount between generations")
+    parser.add_argument("--per-car", action="store_true", help="Feed forward every network on its own instead of batched")
+    parser.add_argument("--patience", type=int, default=None, help="End a generation after this many frames without progress")
+    parser.add_argument("--stop-when-crashed", action="store_true", help="End a generation once every agent has crashed")
+    parser.add_argument("--checkpoint-every", type=int, default=None, help="Save the population every this many generations")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="Directory the checkpoints are written to")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve the training metrics on this port at /metrics")
+    parser.add_argument("--metrics-file", default=None, help="Append the training metrics to this rotating file")
+    args = parser.parse_args()
+
+    run_headless(args.agents, args.frames, args.generations, args.model, args.mutation, not args.per_car,
+                 args.patience, args.stop_when_crashed, args.checkpoint_every, args.checkpoint_dir,
+                 args.metrics_port, args.metrics_file)
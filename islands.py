@@ -0,0 +1,330 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Keeps every island process from printing the pygame greeting
+
+import argparse
+import json
+import multiprocessing
+import queue
+import socket
+import struct
+import threading
+import numpy as np
+from car import Car
+from evaluator import evaluate_genomes, get_scenario_fingerprint
+from fitnessCache import FitnessCache
+from genome import Genome
+from neuralNet import NeuralNetwork
+
+class Migration:
+    """
+    Exchanges genomes between islands over TCP. Every message is a 4 byte length followed by a json object
+    with the neuron counts and the flat parameters of the migrants. Incoming messages are read on background
+    threads and queued, and every send runs on its own thread with a timeout, so a slow or dead peer never
+    blocks the island that sends to it. Messages longer than the migrants of a migration can take are refused
+    before they are read, so a peer cannot make an island buffer more than that
+
+    Args:
+        host (str): The address to listen on
+        port (int): The port to listen on
+        peers (list): The (host, port) of every island the migrants are sent to
+        max_length (int): The length of a message in bytes above which it is refused, see get_max_length
+        timeout (float): Seconds after which a connection to a peer is given up; by default 1.0
+
+    Attributes:
+        peers (list): The (host, port) of every island the migrants are sent to
+        max_length (int): The length of a message in bytes above which it is refused
+        timeout (float): Seconds after which a connection to a peer is given up
+        inbox (Queue): The received messages that were not collected yet
+        senders (dict): The thread of the last send, keyed by the peer
+        server (socket): The listening socket
+    """
+
+    def __init__(self, host, port, peers, max_length, timeout=1.0):
+        self.peers = peers
+        self.max_length = max_length
+        self.timeout = timeout
+        self.inbox = queue.Queue()
+        self.senders = {}
+        self.server = socket.create_server((host, port))
+        threading.Thread(target=self.listen, daemon=True).start()
+
+    def get_max_length(neuron_counts, migrants):
+        """
+        Calculates the longest message a migration of networks with the given neuron counts can need
+
+        Args:
+            neuron_counts (list): The neuron counts shared by the networks
+            migrants (int): The amount of genomes sent per migration
+
+        Returns:
+            int: The length of the message in bytes without its 4 byte length
+        """
+
+        # A float takes at most 24 characters in json, e.g. -2.2250738585072014e-308, plus a separator,
+        # every genome adds its brackets and the neuron counts and keys fit in the rest
+        return migrants * (Genome.get_size(neuron_counts) * 26 + 4) + 1024
+
+    def listen(self):
+        """
+        Accepts connections until the server socket is closed and reads each one on its own thread
+        """
+
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.read, args=(connection,), daemon=True).start()
+
+    def read(self, connection):
+        """
+        Reads one message from a connection and queues it, dropping messages that arrive broken or too slowly
+
+        Args:
+            connection (socket): The accepted connection
+        """
+
+        with connection:
+            connection.settimeout(self.timeout)
+            try:
+                length, = struct.unpack("!I", Migration.read_exactly(connection, 4))
+                if length > self.max_length:
+                    print(f"Refused a migration message of {length} bytes, at most {self.max_length} are expected")
+                    return
+                self.inbox.put(json.loads(Migration.read_exactly(connection, length)))
+            except (OSError, ValueError, struct.error):
+                pass
+
+    def read_exactly(connection, size):
+        """
+        Reads the given amount of bytes from a connection
+
+        Args:
+            connection (socket): The connection to read from
+            size (int): The amount of bytes
+
+        Returns:
+            bytearray: The data read
+
+        Raises:
+            ConnectionError: The peer closed the connection early
+        """
+
+        data = bytearray(size)
+        view = memoryview(data)
+        read = 0
+        while read < size:
+            count = connection.recv_into(view[read:])
+            if not count:
+                raise ConnectionError("Connection closed before the message was complete")
+            read += count
+        return data
+
+    def send(self, neuron_counts, genomes):
+        """
+        Sends genomes to every peer in the background. A peer whose previous send is still running is skipped
+
+        Args:
+            neuron_counts (list): The neuron counts shared by the networks
+            genomes (array): The flat parameters of the migrants with shape (migrants, parameters)
+        """
+
+        data = json.dumps({'neuron_counts': neuron_counts, 'genomes': np.asarray(genomes).tolist()}).encode()
+        message = struct.pack("!I", len(data)) + data
+
+        for peer in self.peers:
+            sender = self.senders.get(peer)
+            if sender is not None and sender.is_alive():
+                continue
+            sender = threading.Thread(target=self.send_to, args=(peer, message), daemon=True)
+            self.senders[peer] = sender
+            sender.start()
+
+    def send_to(self, peer, message):
+        """
+        Delivers a message to a single peer, giving up silently if it cannot be reached in time
+
+        Args:
+            peer (tuple): The (host, port) of the peer
+            message (bytes): The message including its length
+        """
+
+        try:
+            with socket.create_connection(peer, timeout=self.timeout) as connection:
+                connection.sendall(message)
+        except OSError:
+            pass
+
+    def receive(self, neuron_counts, limit=None):
+        """
+        Collects the genomes received since the last call without waiting for any. Messages from peers with other
+        neuron counts, or that are broken, e.g. sent by another version, are dropped with a note instead of raising
+
+        Args:
+            neuron_counts (list): The neuron counts the migrants need to match to be used
+            limit (int): The amount of migrants taken at most, the rest is dropped; by default None for all of them
+
+        Returns:
+            list: The flat parameters of every usable migrant
+        """
+
+        size = Genome.get_size(neuron_counts)
+        genomes = []
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except queue.Empty:
+                return genomes if limit is None else genomes[:limit]
+
+            if not isinstance(message, dict) or not isinstance(message.get('genomes'), list):
+                print("Dropped a migration message that is not a list of genomes")
+                continue
+            if message.get('neuron_counts') != list(neuron_counts):
+                print(f"Dropped migrants with neuron counts {message.get('neuron_counts')} instead of {list(neuron_counts)}")
+                continue
+
+            for genome in message['genomes']:
+                try:
+                    genome = np.asarray(genome, dtype=np.float64)
+                except (TypeError, ValueError):
+                    genome = None
+                if genome is None or genome.shape != (size,) or not np.isfinite(genome).all():
+                    print(f"Dropped a migrant that is not {size} finite parameters")
+                    continue
+                genomes.append(genome)
+
+    def close(self):
+        """
+        Stops listening for migrants and waits for the last sends, which would be lost once the process exits
+        """
+
+        self.server.close()
+        for sender in self.senders.values():
+            sender.join(timeout=self.timeout)
+
+def run_island(port, peers, n=50, frames=1000, generations=10, model_path="model.json", mutation=0.2,
+               interval=5, migrants=2, host="127.0.0.1", save_path=None, seed=None, cache_size=10000):
+    """
+    Trains one population on its own. Like the game it starts from the saved model and mutates it, and every
+    interval generations it sends its best genomes to its peers. Received migrants replace the last agents
+    of the next generation, the unchanged parent always stays in it
+
+    Args:
+        port (int): The port the island listens on for migrants
+        peers (list): The (host, port) of every island the migrants are sent to
+        n (int): The amount of mutated agents per generation; by default 50
+        frames (int): The maximum amount of frames per generation; by default 1000
+        generations (int): The amount of generations; by default 10
+        model_path (str): Path of the json file that stores the model; by default "model.json"
+        mutation (float): The amount by which the agents are mutated; by default 0.2
+        interval (int): The amount of generations between migrations; by default 5
+        migrants (int): The amount of best genomes sent per migration; by default 2
+        host (str): The address to listen on; by default "127.0.0.1"
+        save_path (str): Path to save the best network to at the end; by default None to not save it
+        seed (int): Seed of the mutations, so islands started together do not evolve alike; by default None
+        cache_size (int): The amount of results kept to skip genomes evaluated before, 0 to turn it off; by default 10000
+
+    Returns:
+        NeuralNetwork: The best network of the last generation
+    """
+
+    Genome.seed(seed)
+
+    holder = Car(0, 0, 30, 50, "AGENT")
+    first_mutation = mutation
+    if os.path.exists(model_path):
+        NeuralNetwork.load_model(holder, model_path)
+    else:
+        first_mutation = 1 # Without a model every agent starts with random weights
+
+    parent = holder.brain
+    neuron_counts = NeuralNetwork.get_neuron_counts(parent)
+    migration = Migration(host, port, peers, Migration.get_max_length(neuron_counts, migrants))
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    fingerprint = get_scenario_fingerprint(neuron_counts, frames)
+
+    try:
+        for generation in range(generations):
+            genomes = Genome.create_generation(parent.parameters, n, first_mutation if generation == 0 else mutation)
+
+            # The migrants replace the worst rows, the unchanged parent in the first row is always kept
+            arrivals = migration.receive(neuron_counts, len(genomes) - 1)
+            if arrivals:
+                genomes[len(genomes)-len(arrivals):] = arrivals
+
+            if cache is None:
+                fitness, crash_frames = evaluate_genomes((neuron_counts, genomes, frames))
+            else:
+                fitness, crash_frames = cache.evaluate(genomes, fingerprint, lambda missing: evaluate_genomes((neuron_counts, missing, frames)))
+            ranking = np.argsort(-fitness, kind='stable')
+            NeuralNetwork.set_parameters(parent, genomes[ranking[0]])
+
+            print(f"Island {port} generation {generation}: best distance {fitness[ranking[0]]:.1f}, "
+                  f"{np.count_nonzero(crash_frames >= 0)}/{len(genomes)} crashed, {len(arrivals)} migrants received")
+
+            if (generation+1) % interval == 0:
+                migration.send(neuron_counts, genomes[ranking[:migrants]])
+    finally:
+        migration.close()
+
+    if save_path is not None:
+        NeuralNetwork.save_model(holder, save_path)
+    return parent
+
+def run_local(islands=4, base_port=5000, **kwargs):
+    """
+    Runs several islands as processes on this machine, connected in a ring over localhost
+
+    Args:
+        islands (int): The amount of islands; by default 4
+        base_port (int): The port of the first island, the others follow it; by default 5000
+        **kwargs: The settings passed to run_island
+    """
+
+    ports = [base_port + i for i in range(islands)]
+    processes = []
+    for i, port in enumerate(ports):
+        peers = [("127.0.0.1", ports[(i+1) % islands])] if islands > 1 else []
+        process = multiprocessing.Process(target=run_island, args=(port, peers), kwargs=dict(kwargs, seed=port))
+        process.start()
+        processes.append(process)
+
+    for process in processes:
+        process.join()
+
+def parse_peer(text):
+    """
+    Parses a peer given as host:port
+
+    Args:
+        text (str): The peer address
+
+    Returns:
+        tuple: The host and port of the peer
+    """
+
+    host, port = text.rsplit(":", 1)
+    return (host, int(port))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train populations on separate islands that exchange their best networks")
+    parser.add_argument("--local", type=int, default=0, help="Run this amount of islands on localhost instead of a single one")
+    parser.add_argument("--port", type=int, default=5000, help="Port of this island, or of the first local island")
+    parser.add_argument("--host", default="127.0.0.1", help="Address this island listens on")
+    parser.add_argument("--peers", nargs="*", type=parse_peer, default=[], help="Islands to send migrants to as host:port")
+    parser.add_argument("--agents", type=int, default=50, help="Amount of mutated agents per generation")
+    parser.add_argument("--frames", type=int, default=1000, help="Maximum amount of frames per generation")
+    parser.add_argument("--generations", type=int, default=10, help="Amount of generations")
+    parser.add_argument("--model", default="model.json", help="Path of the model to start from")
+    parser.add_argument("--mutation", type=float, default=0.2, help="Mutation amount of every generation")
+    parser.add_argument("--interval", type=int, default=5, help="Generations between migrations")
+    parser.add_argument("--migrants", type=int, default=2, help="Best genomes sent per migration")
+    parser.add_argument("--save", default=None, help="Path to save the best network of this island to")
+    args = parser.parse_args()
+
+    settings = dict(n=args.agents, frames=args.frames, generations=args.generations, model_path=args.model,
+                    mutation=args.mutation, interval=args.interval, migrants=args.migrants)
+    if args.local:
+        run_local(args.local, args.port, **settings)
+    else:
+        run_island(args.port, args.peers, host=args.host, save_path=args.save, **settings)
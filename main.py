@@ -1,147 +1,156 @@
+import argparse
 import pygame
 import sys
-import random
-import os
-from car import Car
-from road import Road
 from neuralNet import NeuralNetwork
 from buttons import Button
-
-def main():
+from checkpointer import Checkpointer
+from profiler import FrameProfiler
+from metrics import TrainingMetrics
+from dirtyRegions import DirtyRegions
+from carRenderer import CarRenderer
+from scenario import SCREEN_HEIGHT, SCREEN_WIDTH, SCREEN_BGCOLOR, ROAD_WIDTH
+from trainer import Trainer
+
+def main(profile=False, profile_csv=None, metrics_port=None, metrics_file=None, dirty_rects=False, max_agents=100, heatmap=False):
     """
     The main function that initializes the game, sets up the screen and objects, and runs the game loop.
+
+    Args:
+        profile (bool): If the frame profiler overlay is shown from the start, it can be toggled with 'P'; by default False
+        profile_csv (str): Path of a csv file the timings of every frame are written to; by default None
+        metrics_port (int): Port the training metrics are served on in the Prometheus text format; by default None
+        metrics_file (str): Path of a rotating file the training metrics are written to; by default None
+        dirty_rects (bool): If only the changed parts of the screen are pushed to the display instead of flipping the whole screen; by default False
+        max_agents (int): The amount of agents besides the best car that are drawn at most; by default 100
+        heatmap (bool): If a density heatmap is drawn in place of the agents once there are more than max_agents; by default False
     """
 
     pygame.init()
 
-    # car screen settings
-    SCREEN_HEIGHT = 800
-    SCREEN_WIDTH = 1100
-    SCREEN_BGCOLOR = (100, 100, 100)
-
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
     pygame.display.set_caption("Self Driving Car Simulation")
 
-    # Road instance
-    ROAD_WIDTH = SCREEN_WIDTH/3
-    ROAD_CENTER = 50
-    LINE_CENTER = ROAD_WIDTH/2 + ROAD_CENTER
-    road = Road(ROAD_CENTER, ROAD_WIDTH, LINE_CENTER, SCREEN_HEIGHT, 3)
+    # Runs the generations on its own, loading the model if it exists for the first one.
+    # A generation ends once every agent crashed or the best car made no progress for 5 seconds
+    # Saving happens in the background, every 10th generation is kept as a checkpoint as well
+    checkpointer = Checkpointer("checkpoints", keep=5, every=10)
+
+    # Times the phases of every frame while enabled, always if the metrics need the phase times
+    publish = metrics_port is not None or metrics_file is not None
+    profiler = FrameProfiler(profile, csv_path=profile_csv, measure=publish)
+
+    # Publishes the throughput of the training
+    metrics = None
+    if publish:
+        metrics = TrainingMetrics(profiler=profiler)
+        if metrics_port is not None:
+            metrics.serve(metrics_port)
+        if metrics_file is not None:
+            metrics.write_to(metrics_file)
 
-    # Car agent instances
     n = 50
-    cars = generate_cars(n, road, "AGENT")
-    best_car = cars[0]
-
-    #Load model if exists
-    if os.path.exists("model.json"):
-        for i in range(0, len(cars)):
-            NeuralNetwork.load_model(cars[i], "model.json")
-        if i > 0:
-            NeuralNetwork.mutate(cars[i].brain, 0.2)
-
-    # Traffic instance
-    traffic = [
-        Car(road.get_lane_center(0, 30), 500, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(0, 30), 100, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(1, 30), 800, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(2, 30), 500, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(2, 30), 300, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(1, 30), 1100, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(1, 30), 700, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(0, 30), 1200, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(0, 30), 100, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(1, 30), -500, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(2, 30), -300, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(2, 30), -200, 30, 50, "DUMMY"),
-        Car(road.get_lane_center(1, 30), 300, 30, 50, "DUMMY")
-    ]
-    
+    trainer = Trainer(n, "model.json", patience=300, checkpointer=checkpointer, profiler=profiler, metrics=metrics)
+
     # Button instance
-    save_button = Button("Save Model", 0, 0, 200, 50, lambda: NeuralNetwork.save_model(best_car, 'model.json'))
-    discard_button = Button("Delete Model", 250, 0, 200, 50, lambda: NeuralNetwork.delete_model('model.json'))
+    save_button = Button("Save Model", 0, 0, 200, 50, lambda: checkpointer.save_model(trainer.simulation.best_car.brain, 'model.json'))
+    discard_button = Button("Delete Model", 250, 0, 200, 50, lambda: checkpointer.delete_model('model.json'))
+
+    # Only the changed parts of the screen are pushed to the display in the dirty rectangle mode. The network panel
+    # then keeps its last drawing and only repaints changed nodes, so the scene left of it is clipped to not draw over it
+    regions = DirtyRegions(screen.get_rect()) if dirty_rects else None
+    scene = pygame.Rect(0, 0, ROAD_WIDTH+70, SCREEN_HEIGHT)
+
+    # Only the cars in the scene are drawn and a large population is drawn through a sample or a heatmap
+    renderer = CarRenderer(max_agents, heatmap)
 
     # Game loop
     running = True
     clock = pygame.time.Clock()
 
     while running:
+        profiler.start_frame()
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
                     running = False
-                    main()
+                    checkpointer.flush() # The next run numbers its checkpoints on from the ones written here
+                    profiler.close()
+                    if metrics is not None:
+                        metrics.close()
+                    main(profile, profile_csv, metrics_port, metrics_file, dirty_rects, max_agents, heatmap)
+                if event.key == pygame.K_p:
+                    profiler.toggle()
             save_button.handle_event(event)
             discard_button.handle_event(event)
-                   
-        # Update agent and traffic cars
-        for traffic_car in traffic:
-            traffic_car.update(road.borders,[])
-        for agent_car in cars:
-            agent_car.update(road.borders, traffic)
-        
-        # Find the minimum y value among all cars
-        min_y = min(car.y for car in cars)
-
-        # Find the cars with the minimum y value
-        best_car = next(car for car in cars if car.y == min_y)
+        profiler.mark("events")
 
-        road.scroll_speed = best_car.speed
+        # Update agent and traffic cars, starting the next generation when the current one ended
+        simulation = trainer.simulation
+        trainer.step()
+        best_car = simulation.best_car
+        road = simulation.road
+        profiler.mark("trainer")
 
+        if regions is not None:
+            screen.set_clip(scene)
         screen.fill(SCREEN_BGCOLOR)
 
-        road.draw(screen)
+        road_rects = road.draw(screen)
+        profiler.mark("road")
 
         # Draw the cars
-        for traffic_car in traffic:
-            traffic_car.y += road.scroll_speed # Simulates overtaking effect by adjusting the traffic cars y position relevant to the scroll speed
-            traffic_car.draw(screen, (0, 0, 255,0))
-        for i in range(1, len(cars)):
-            cars[i].y += road.scroll_speed
-            cars[i].draw(screen, (255, 255, 0, 150))
-        best_car.draw(screen, (0, 255, 0), True)
+        car_rects = renderer.draw(screen, simulation, scene)
+        if regions is not None:
+            regions.add_moving(car_rects)
+        profiler.mark("cars")
 
         # Draw the buttons
-        save_button.draw(screen)
-        discard_button.draw(screen)
+        button_rects = save_button.draw(screen) + discard_button.draw(screen)
+        if regions is not None:
+            screen.set_clip(None)
+        profiler.mark("buttons")
 
         # Debug and visualization for the neural network
-        NeuralNetwork.draw_debug(screen, ROAD_WIDTH+70, SCREEN_WIDTH/1.75, SCREEN_HEIGHT, best_car.brain)
+        network_rects = NeuralNetwork.draw_debug(screen, ROAD_WIDTH+70, SCREEN_WIDTH/1.75, SCREEN_HEIGHT, best_car.brain,
+                                                 changed_only=regions is not None and not regions.full)
+        profiler.mark("network")
 
-        pygame.display.flip()
+        overlay_rects = profiler.draw(screen, 10, 60)
+        profiler.mark("overlay")
 
-        clock.tick(60)
+        if regions is None:
+            pygame.display.flip()
+        else:
+            regions.add(road_rects + button_rects + network_rects)
+            regions.add_moving(overlay_rects)
+            regions.update()
+        profiler.mark("flip")
 
-    # Quit program
+        clock.tick(60)
+        profiler.mark("wait")
+        profiler.end_frame()
+
+    # Quit program once every pending save is written
+    checkpointer.flush()
+    profiler.close()
+    if metrics is not None:
+        metrics.close()
     pygame.quit
     sys.exit()
 
-def generate_cars(n, road, car_type):
-    """
-    Generates n amount of cars
-
-    Args:
-        n (int): The amount of cars to be generated
-        road (Road): The road of the simulation
-        car_type (str): Type of car to generate (DUMMY/AGENT)
-
-    Returns:
-        list: The cars in the traffic
-    """
-
-    cars = []
-    for i in range(n+1):
-
-        if car_type == "DUMMY":
-            cars.append(Car(road.get_lane_center(random.randrange(0, 2), 30), random.randrange(0, 550), 30, 50, "DUMMY"))
-        elif car_type == "AGENT":
-            cars.append(Car(road.get_lane_center(1, 30), 600, 30, 50, "AGENT", 5))
-    
-    return cars
-
 if __name__ == '__main__':
-    main()
-
+    parser = argparse.ArgumentParser(description="Run the self driving car simulation")
+    parser.add_argument("--profile", action="store_true", help="Show the frame profiler overlay from the start, 'P' toggles it")
+    parser.add_argument("--profile-csv", default=None, help="Write the timings of every frame to this csv file")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve the training metrics on this port at /metrics")
+    parser.add_argument("--metrics-file", default=None, help="Append the training metrics to this rotating file")
+    parser.add_argument("--dirty-rects", action="store_true", help="Only push the changed parts of the screen to the display")
+    parser.add_argument("--max-agents", type=int, default=100, help="Agents besides the best car that are drawn at most")
+    parser.add_argument("--heatmap", action="store_true", help="Draw a density heatmap instead of a sample once there are more agents")
+    args = parser.parse_args()
+
+    main(args.profile, args.profile_csv, args.metrics_port, args.metrics_file, args.dirty_rects, args.max_agents, args.heatmap)
 
@@ -0,0 +1,254 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Runs without a display
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import random
+import sys
+import tracemalloc
+import types
+from collections import deque
+import numpy as np
+from car import Car
+from genome import Genome
+from scenario import create_road, generate_cars, generate_traffic
+from sensor import Sensor
+from simulation import Simulation
+from trainer import Trainer
+from utils import Utils
+
+class MemoryReport:
+    """
+    Class that measures what a population costs in memory. The agents are sized object by object and split into
+    their subsystems, the allocations of building a population and the peak of every generation are traced with
+    tracemalloc, and the hot paths are wrapped to find how much they allocate and throw away every frame
+
+    Attributes:
+        hot_paths (dict): The class and name of every function whose per frame allocations are measured, keyed by its label
+    """
+
+    hot_paths = {
+        'Car.create_polygon': (Car, 'create_polygon'),
+        'Sensor.cast_rays': (Sensor, 'cast_rays'),
+        'Utils.get_intersection': (Utils, 'get_intersection')
+    }
+
+    def get_size(obj, seen):
+        """
+        Calculates the size of an object and everything it references that was not counted before.
+        Arrays count their data if they own it, views count the array they look into
+
+        Args:
+            obj (object): The object to size
+            seen (set): The ids of the objects that were counted already, extended by this call
+
+        Returns:
+            int: The size in bytes
+        """
+
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+            return 0
+        seen.add(id(obj))
+
+        size = sys.getsizeof(obj)
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                size += MemoryReport.get_size(obj.base, seen)
+        elif isinstance(obj, dict):
+            size += sum(MemoryReport.get_size(key, seen) + MemoryReport.get_size(value, seen) for key, value in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            size += sum(MemoryReport.get_size(item, seen) for item in obj)
+        elif hasattr(obj, '__dict__'):
+            size += MemoryReport.get_size(obj.__dict__, seen)
+        return size
+
+    def get_breakdown(simulation):
+        """
+        Sizes the agents of a simulation split into their subsystems. Objects shared by several agents, like the
+        read only parameters of the loaded model, are counted once. The car does not count its sensor, controls
+        and brain, the sensor does not count the car it points back to
+
+        Args:
+            simulation (Simulation): The simulation whose agents are sized
+
+        Returns:
+            dict: The bytes of every subsystem over all agents, keyed by its name
+        """
+
+        subsystems = ('car', 'controls', 'sensor', 'brain')
+        seen = {name: set() for name in subsystems}
+        excluded = {id(simulation.population)} if simulation.population is not None else set()
+        breakdown = dict.fromkeys(subsystems, 0)
+
+        for car in simulation.cars:
+            parts = {'controls': car.controls, 'sensor': car.sensor, 'brain': car.brain}
+            seen['car'].update(excluded, (id(part) for part in parts.values()))
+            seen['sensor'].add(id(car))
+            breakdown['car'] += MemoryReport.get_size(car, seen['car'])
+            for name, part in parts.items():
+                breakdown[name] += MemoryReport.get_size(part, seen[name])
+
+        # The batched simulation keeps the state of the cars and the networks in shared arrays
+        if simulation.population is not None:
+            population = simulation.population
+            breakdown['population arrays'] = sum(array.nbytes for array in vars(population).values() if isinstance(array, np.ndarray))
+            breakdown['batch networks'] = MemoryReport.get_size([simulation.batch, simulation.active_batch], set())
+
+        return breakdown
+
+    def measure_creation(n, batched):
+        """
+        Traces the memory allocated while a trainer creates its first generation, the road and traffic included
+
+        Args:
+            n (int): The amount of agent cars besides the first one
+            batched (bool): If the simulation runs batched, see Simulation
+
+        Returns:
+            Trainer: The created trainer
+            int: The bytes still allocated after its creation
+        """
+
+        before = tracemalloc.get_traced_memory()[0]
+        trainer = Trainer(n, "model.json", frame_budget=None, stop_when_damaged=True, batched=batched)
+        return trainer, tracemalloc.get_traced_memory()[0] - before
+
+    def measure_generations(trainer, generations, frames):
+        """
+        Runs generations and traces the peak memory of each of them
+
+        Args:
+            trainer (Trainer): The trainer running the generations
+            generations (int): The amount of generations
+            frames (int): The frame budget of every generation
+
+        Returns:
+            list: The peak bytes of every generation above the memory allocated before it started
+        """
+
+        trainer.frame_budget = frames
+        peaks = []
+        for _ in range(generations):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            trainer.run_generation()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        return peaks
+
+    def measure_churn(n, frames):
+        """
+        Runs a per car simulation, the path that calls the hot paths, with every hot path wrapped to trace
+        how much it allocates per call. The bytes are the peak a call reaches above the memory allocated before it,
+        so everything a call allocates counts even if it is freed again right after. The hot paths do not call each other
+
+        Args:
+            n (int): The amount of agent cars besides the first one
+            frames (int): The amount of simulated frames
+
+        Returns:
+            dict: The calls and allocated bytes per frame of every hot path, keyed by its label
+        """
+
+        churn = {label: [0, 0] for label in MemoryReport.hot_paths}
+        originals = {}
+
+        def wrap(label, function):
+            def measured(*args, **kwargs):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                result = function(*args, **kwargs)
+                churn[label][0] += 1
+                churn[label][1] += tracemalloc.get_traced_memory()[1] - before
+                return result
+            return measured
+
+        road = create_road()
+        simulation = Simulation(road, generate_cars(n, road, "AGENT"), generate_traffic(road), batched=False)
+        for label, (owner, name) in MemoryReport.hot_paths.items():
+            originals[label] = owner.__dict__[name]
+            setattr(owner, name, wrap(label, originals[label]))
+        try:
+            for _ in range(frames):
+                simulation.step()
+        finally:
+            for label, (owner, name) in MemoryReport.hot_paths.items():
+                setattr(owner, name, originals[label])
+
+        return {label: (calls / frames, allocated / frames) for label, (calls, allocated) in churn.items()}
+
+def format_bytes(size):
+    """
+    Formats a size in bytes with a binary unit
+
+    Args:
+        size (float): The size in bytes
+
+    Returns:
+        str: The size, e.g. "1.5 MiB"
+    """
+
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+def run_report(n, frames, generations, batched, churn_agents, churn_frames, churn_threshold, seed=0):
+    """
+    Prints the memory of a population: the bytes per agent and per subsystem, the peak of every generation
+    and the allocation churn of the hot paths
+
+    Args:
+        n (int): The amount of agent cars besides the first one
+        frames (int): The frame budget of every generation
+        generations (int): The amount of generations whose peak is traced
+        batched (bool): If the simulation runs batched, see Simulation
+        churn_agents (int): The amount of agent cars of the per car simulation measuring the churn
+        churn_frames (int): The amount of frames the churn is measured over
+        churn_threshold (int): The bytes per frame above which a hot path is flagged
+        seed (int): Seed of the networks and traffic; by default 0
+
+    Returns:
+        dict: The measured values
+    """
+
+    random.seed(seed)
+    Genome.seed(seed)
+    tracemalloc.start()
+
+    trainer, created = MemoryReport.measure_creation(n, batched)
+    agents = len(trainer.simulation.cars)
+    print(f"Population of {agents} agents ({'batched' if batched else 'per car'}): {format_bytes(created)} allocated, "
+          f"{format_bytes(created/agents)} per agent")
+
+    breakdown = MemoryReport.get_breakdown(trainer.simulation)
+    for name, size in breakdown.items():
+        print(f"  {name}: {format_bytes(size)} ({format_bytes(size/agents)} per agent)")
+
+    peaks = MemoryReport.measure_generations(trainer, generations, frames)
+    for generation, peak in enumerate(peaks):
+        print(f"Generation {generation}: peak {format_bytes(peak)} above its start")
+
+    churn = MemoryReport.measure_churn(churn_agents, churn_frames)
+    print(f"Allocations per frame of the hot paths with {churn_agents+1} agents (per car):")
+    for label, (calls, allocated) in churn.items():
+        flag = " <- churn" if allocated > churn_threshold else ""
+        print(f"  {label}: {calls:.0f} calls, {format_bytes(allocated)}{flag}")
+
+    tracemalloc.stop()
+    return {'created': created, 'agents': agents, 'breakdown': breakdown, 'peaks': peaks, 'churn': churn}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report the memory a population needs, traced with tracemalloc")
+    parser.add_argument("--agents", type=int, default=1000, help="Amount of agent cars besides the first one")
+    parser.add_argument("--frames", type=int, default=100, help="Frame budget of every generation")
+    parser.add_argument("--generations", type=int, default=2, help="Generations whose peak memory is traced")
+    parser.add_argument("--per-car", action="store_true", help="Update every car on its own instead of batched")
+    parser.add_argument("--churn-agents", type=int, default=20, help="Agent cars of the simulation measuring the churn")
+    parser.add_argument("--churn-frames", type=int, default=50, help="Frames the churn is measured over")
+    parser.add_argument("--churn-threshold", type=int, default=4096, help="Bytes per frame above which a hot path is flagged")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the networks and traffic")
+    args = parser.parse_args()
+
+    run_report(args.agents, args.frames, args.generations, not args.per_car, args.churn_agents, args.churn_frames,
+               args.churn_threshold, args.seed)
@@ -0,0 +1,194 @@
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+class TrainingMetrics:
+    """
+    Class that collects live counters and gauges of a training run, so throughput can be watched from dashboards
+    without attaching a profiler. The counters are updated every frame, the gauges are refreshed at a fixed interval
+    into a snapshot that can be served over HTTP in the Prometheus text format and appended to a rotating text file
+
+    Args:
+        interval (float): The seconds between refreshes of the gauges; by default 1.0
+        profiler (FrameProfiler): Provides the time spent in each phase, e.g. sensing, inference and physics; by default None
+
+    Attributes:
+        interval (float): The seconds between refreshes of the gauges
+        profiler (FrameProfiler): Provides the time spent in each phase
+        agent_steps (int): The amount of agent updates so far
+        frames (int): The amount of frames so far
+        snapshot (list): The name, type, help, labels and value of every metric at the last refresh
+        lock (Lock): Guards the snapshot, which is read by the server thread
+        last_refresh (tuple): The time, agent steps and frames at the last refresh
+        server (ThreadingHTTPServer): The HTTP server, None if the metrics are not served
+        logger (Logger): Writes the snapshots to the rotating file, None if they are not written
+    """
+
+    def __init__(self, interval=1.0, profiler=None):
+        self.interval = interval
+        self.profiler = profiler
+        self.agent_steps = 0
+        self.frames = 0
+        self.snapshot = []
+        self.lock = threading.Lock()
+        self.last_refresh = (time.perf_counter(), 0, 0)
+        self.server = None
+        self.logger = None
+
+    def update(self, trainer, agent_steps):
+        """
+        Counts a simulated frame, called by the Trainer after each step, and refreshes the gauges when they are due
+
+        Args:
+            trainer (Trainer): The trainer running the simulation
+            agent_steps (int): The amount of agent updates in the frame
+        """
+
+        self.frames += 1
+        self.agent_steps += agent_steps
+
+        now = time.perf_counter()
+        if now - self.last_refresh[0] >= self.interval:
+            self.refresh(trainer, now)
+
+    def refresh(self, trainer, now):
+        """
+        Takes a new snapshot of every metric and writes it to the file if there is one
+
+        Args:
+            trainer (Trainer): The trainer running the simulation
+            now (float): The current time from time.perf_counter
+        """
+
+        simulation = trainer.simulation
+        elapsed = now - self.last_refresh[0]
+        live = simulation.count_active()
+        distances = simulation.get_distances()
+
+        snapshot = [
+            ('sdc_agent_steps_total', 'counter', 'Agent updates simulated', {}, self.agent_steps),
+            ('sdc_frames_total', 'counter', 'Frames simulated', {}, self.frames),
+            ('sdc_agent_steps_per_second', 'gauge', 'Agent updates per second since the last refresh', {}, (self.agent_steps - self.last_refresh[1]) / elapsed),
+            ('sdc_frames_per_second', 'gauge', 'Frames per second since the last refresh', {}, (self.frames - self.last_refresh[2]) / elapsed),
+            ('sdc_agents', 'gauge', 'Agents of the current generation', {'state': 'live'}, live),
+            ('sdc_agents', 'gauge', 'Agents of the current generation', {'state': 'crashed'}, len(simulation.cars) - live),
+            ('sdc_generation', 'gauge', 'Number of the current generation', {}, trainer.generation),
+            ('sdc_best_fitness', 'gauge', 'Distance driven by the best car of the current generation', {}, simulation.get_best_distance()),
+            ('sdc_median_fitness', 'gauge', 'Median distance driven by the agents of the current generation', {}, float(np.median(distances)))
+        ]
+        if self.profiler is not None:
+            for phase, nanoseconds in self.profiler.totals.items():
+                snapshot.append(('sdc_phase_seconds_total', 'counter', 'Time spent in each phase of the frames', {'phase': phase}, nanoseconds / 1e9))
+
+        with self.lock:
+            self.snapshot = snapshot
+        self.last_refresh = (now, self.agent_steps, self.frames)
+
+        if self.logger is not None:
+            self.logger.info(json.dumps({
+                'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'metrics': {TrainingMetrics.get_label(name, labels): value for name, _, _, labels, value in snapshot}
+            }))
+
+    def get_label(name, labels):
+        """
+        Formats a metric name with its labels like Prometheus does
+
+        Args:
+            name (str): The name of the metric
+            labels (dict): The labels of the metric
+
+        Returns:
+            str: The name followed by the labels in braces, if there are any
+        """
+
+        if not labels:
+            return name
+        return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+    def render(self):
+        """
+        Renders the last snapshot in the Prometheus text format
+
+        Returns:
+            str: The metrics with their help and type lines
+        """
+
+        with self.lock:
+            snapshot = list(self.snapshot)
+
+        lines = []
+        described = set()
+        for name, kind, description, labels, value in snapshot:
+            if name not in described:
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+            lines.append(f"{TrainingMetrics.get_label(name, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=8000, host="127.0.0.1"):
+        """
+        Serves the metrics on /metrics from a background thread
+
+        Args:
+            port (int): The port to listen on; by default 8000
+            host (str): The address to listen on; by default "127.0.0.1"
+        """
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes would flood the console otherwise
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def write_to(self, file_path, max_bytes=1000000, backups=3):
+        """
+        Appends every snapshot as a line of json to a file that is rotated once it gets too big
+
+        Args:
+            file_path (str): Path of the file
+            max_bytes (int): The size after which the file is rotated; by default 1000000
+            backups (int): The amount of rotated files kept; by default 3
+        """
+
+        self.logger = logging.getLogger(f"metrics.{file_path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(file_path, maxBytes=max_bytes, backupCount=backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+
+    def close(self):
+        """
+        Stops the server and closes the file
+        """
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.logger is not None:
+            for handler in list(self.logger.handlers):
+                handler.close()
+                self.logger.removeHandler(handler)
+            self.logger = None
@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import struct
+import numpy as np
+from genome import Genome
+
+class ModelFile:
+    """
+    Versioned binary format for one or many networks that can be memory-mapped. The file starts with a header
+    holding the format version, the data type, the neuron counts and the amount of genomes, followed by the genomes
+    as one contiguous little-endian array with a row of flat parameters per network (see NeuralNetwork.get_parameters)
+
+    Attributes:
+        magic (bytes): The bytes every model file starts with
+        version (int): The version of the format written
+        extension (str): The file extension of binary models
+        header (str): The struct layout of the fixed part of the header
+        alignment (int): The amount of bytes the start of the data is aligned to
+    """
+
+    magic = b"SDCM"
+    version = 1
+    extension = ".sdcm"
+    header = "<4sHBBII" # magic, version, item size, layer count, genome count, data offset
+    alignment = 64
+
+    def is_binary(file_path):
+        """
+        Checks if a path refers to a binary model by its extension
+
+        Args:
+            file_path (str): Path of the model file
+
+        Returns:
+            bool: True if the model is stored in the binary format
+        """
+
+        return os.path.splitext(file_path)[1] == ModelFile.extension
+
+    def save(file_path, genomes, neuron_counts, dtype=np.float32):
+        """
+        Writes networks to a binary model file
+
+        Args:
+            file_path (str): Path of the model file
+            genomes (array): The flat parameters of one network or of many with shape (networks, parameters)
+            neuron_counts (list): The neuron counts shared by all networks
+            dtype (type): The data type the parameters are stored as, float32 or float64; by default float32
+        """
+
+        genomes = np.atleast_2d(np.asarray(genomes, dtype=np.dtype(dtype).newbyteorder('<')))
+
+        fixed_size = struct.calcsize(ModelFile.header) + 4*len(neuron_counts)
+        offset = -(-fixed_size // ModelFile.alignment) * ModelFile.alignment
+
+        header = struct.pack(ModelFile.header, ModelFile.magic, ModelFile.version, genomes.itemsize, len(neuron_counts)-1, len(genomes), offset)
+        header += struct.pack(f"<{len(neuron_counts)}I", *neuron_counts)
+
+        with open(file_path, 'wb') as f:
+            f.write(header.ljust(offset, b"\0"))
+            f.write(np.ascontiguousarray(genomes).tobytes())
+
+    def read_header(file_path):
+        """
+        Reads and checks the header of a binary model file
+
+        Args:
+            file_path (str): Path of the model file
+
+        Returns:
+            dict: The version, data type, neuron counts, amount of genomes and data offset of the file
+
+        Raises:
+            ValueError: The file is no binary model, has a version or data type that cannot be read or holds no network
+        """
+
+        with open(file_path, 'rb') as f:
+            fixed = f.read(struct.calcsize(ModelFile.header))
+            if len(fixed) < struct.calcsize(ModelFile.header):
+                raise ValueError(f"'{file_path}' is too short to be a binary model")
+
+            magic, version, item_size, level_count, count, offset = struct.unpack(ModelFile.header, fixed)
+            if magic != ModelFile.magic:
+                raise ValueError(f"'{file_path}' is not a binary model")
+            if version > ModelFile.version:
+                raise ValueError(f"'{file_path}' has version {version}, only up to {ModelFile.version} can be read")
+            if item_size not in (4, 8):
+                raise ValueError(f"'{file_path}' stores {item_size} byte parameters, only float32 and float64 can be read")
+            if count == 0:
+                raise ValueError(f"'{file_path}' holds no network")
+            neuron_counts = list(struct.unpack(f"<{level_count+1}I", f.read(4*(level_count+1))))
+
+        return {
+            'version': version,
+            'dtype': np.dtype(f"<f{item_size}"),
+            'neuron_counts': neuron_counts,
+            'count': count,
+            'offset': offset
+        }
+
+    def load(file_path, mmap=True):
+        """
+        Reads the networks of a binary model file
+
+        Args:
+            file_path (str): Path of the model file
+            mmap (bool): If the genomes are memory-mapped read only instead of read into memory; by default True
+
+        Returns:
+            array: The flat parameters of every network with shape (networks, parameters)
+            list: The neuron counts shared by all networks
+        """
+
+        header = ModelFile.read_header(file_path)
+        shape = (header['count'], Genome.get_size(header['neuron_counts']))
+
+        if mmap:
+            genomes = np.memmap(file_path, dtype=header['dtype'], mode='r', offset=header['offset'], shape=shape)
+        else:
+            with open(file_path, 'rb') as f:
+                f.seek(header['offset'])
+                genomes = np.fromfile(f, dtype=header['dtype'], count=shape[0]*shape[1]).reshape(shape)
+        return genomes, header['neuron_counts']
+
+    def read_json(file_path):
+        """
+        Reads a model saved by NeuralNetwork.save_model as a flat genome
+
+        Args:
+            file_path (str): Path of the json file
+
+        Returns:
+            array: The flat parameters of the network
+            list: The neuron counts of the network
+        """
+
+        with open(file_path, 'r') as f:
+            model_data = json.load(f)
+
+        levels = model_data['levels']
+        neuron_counts = [len(levels[0]['weights'])] + [len(level['biases']) for level in levels]
+        parameters = []
+        for level in levels:
+            parameters.append(np.asarray(level['biases'], dtype=np.float64).ravel())
+            parameters.append(np.asarray(level['weights'], dtype=np.float64).ravel())
+        return np.concatenate(parameters), neuron_counts
+
+    def write_json(file_path, genome, neuron_counts):
+        """
+        Writes a flat genome in the json format of NeuralNetwork.save_model
+
+        Args:
+            file_path (str): Path of the json file
+            genome (array): The flat parameters of the network
+            neuron_counts (list): The neuron counts of the network
+        """
+
+        genome = np.asarray(genome, dtype=np.float64)
+        model_data = {'levels': []}
+        for biases, weights, shape in Genome.get_level_slices(neuron_counts):
+            model_data['levels'].append({
+                'inputs': [0 for _ in range(shape[0])],
+                'outputs': [0 for _ in range(shape[1])],
+                'weights': genome[weights].reshape(shape).tolist(),
+                'biases': genome[biases].tolist()
+            })
+
+        with open(file_path, 'w') as f:
+            json.dump(model_data, f)
+
+    def json_to_binary(json_path, binary_path, dtype=np.float32):
+        """
+        Converts a json model into a binary model file holding one network
+
+        Args:
+            json_path (str): Path of the json file
+            binary_path (str): Path of the binary model file
+            dtype (type): The data type the parameters are stored as; by default float32
+        """
+
+        genome, neuron_counts = ModelFile.read_json(json_path)
+        ModelFile.save(binary_path, genome, neuron_counts, dtype)
+
+    def binary_to_json(binary_path, json_path, index=0):
+        """
+        Converts one network of a binary model file into a json model
+
+        Args:
+            binary_path (str): Path of the binary model file
+            json_path (str): Path of the json file
+            index (int): The network to convert, e.g. the best of a saved population; by default 0
+        """
+
+        genomes, neuron_counts = ModelFile.load(binary_path, mmap=False)
+        ModelFile.write_json(json_path, genomes[index], neuron_counts)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert models between the json and the binary format")
+    parser.add_argument("source", help="The model to convert, the format is taken from its extension")
+    parser.add_argument("target", help="The path of the converted model")
+    parser.add_argument("--index", type=int, default=0, help="The network of a binary model converted to json")
+    parser.add_argument("--float64", action="store_true", help="Store the binary parameters as float64 instead of float32")
+    args = parser.parse_args()
+
+    if ModelFile.is_binary(args.source):
+        ModelFile.binary_to_json(args.source, args.target, args.index)
+    else:
+        ModelFile.json_to_binary(args.source, args.target, np.float64 if args.float64 else np.float32)
+    print(f"Converted '{args.source}' to '{args.target}'.")
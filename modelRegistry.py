@@ -0,0 +1,66 @@
+import os
+from modelFile import ModelFile
+from neuralNet import NeuralNetwork
+
+class ModelRegistry:
+    """
+    Reads every saved model only once and hands out networks that share its parameters. The shared parameters
+    are read only, so a network keeps referencing them until NeuralNetwork.mutate gives it a private copy.
+    A model is read again once its file changed, e.g. after the "Save Model" button was pressed
+
+    Attributes:
+        models (dict): The modification time, size, parameters and neuron counts of every read model, keyed by its path
+    """
+
+    models = {}
+
+    def load(file_path):
+        """
+        Gets the parameters of a model, reading the file only if it was not read before or changed since
+
+        Args:
+            file_path (str): Path of the json or binary file that stores the model
+
+        Returns:
+            array: The read only biases followed by the weights of each level
+            list: The neuron counts of the network
+        """
+
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        entry = ModelRegistry.models.get(path)
+
+        if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            if ModelFile.is_binary(path):
+                genomes, neuron_counts = ModelFile.load(path)
+                parameters = genomes[0].astype('float64')
+            else:
+                parameters, neuron_counts = ModelFile.read_json(path)
+            parameters.flags.writeable = False
+
+            entry = (stat.st_mtime_ns, stat.st_size, parameters, neuron_counts)
+            ModelRegistry.models[path] = entry
+            print(f"Model loaded from '{file_path}'.")
+
+        return entry[2], entry[3]
+
+    def create_network(file_path):
+        """
+        Creates a network that shares the parameters of a model until it is mutated
+
+        Args:
+            file_path (str): Path of the json or binary file that stores the model
+
+        Returns:
+            NeuralNetwork: The network referencing the shared parameters
+        """
+
+        parameters, neuron_counts = ModelRegistry.load(file_path)
+        return NeuralNetwork(neuron_counts, parameters)
+
+    def clear():
+        """
+        Forgets every read model, so the next load reads the files again
+        """
+
+        ModelRegistry.models.clear()
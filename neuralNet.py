@@ -1,9 +1,8 @@
-import random
-import pygame
+import numpy as np
 import json
 import os
-import random
-from utils import Utils
+from genome import Genome
+from modelFile import ModelFile
 from visualizer import Visualizer
 
 class NeuralNetwork:
@@ -13,21 +12,60 @@ class NeuralNetwork:
     Args:
         neuron_counts (list): The amount of neurons that the network is going to use.
             Consisting of the input nodes, the hidden layer nodes and the amount of output nodes
+        parameters (array): The flat buffer the biases and weights are stored in, e.g. a row of a genome matrix;
+            by default None to create a new one with random values
 
     Attributes:
-        levels (list): Stores all the levels of the network
+        parameters (array): The biases followed by the weights of each level in one contiguous array
+        levels (list): Stores all the levels of the network, whose biases and weights are views of parameters
+        version (int): Counts the changes of the parameters, so drawings of the weights know when they are outdated
     """
 
-    def __init__(self, neuron_counts):
+    def __init__(self, neuron_counts, parameters=None):
+        if parameters is None:
+            parameters = np.empty(Genome.get_size(neuron_counts), dtype=np.float64)
+            Genome.randomize(parameters)
+        self.parameters = parameters
         self.levels = []
+        self.version = 0
 
         # Creates a level for each input and output layer and appends it to the network
         # i being the input layer and i+1 the output respectively the input for the next layer,
-        for i in range(len(neuron_counts)-1):
+        for biases, weights, shape in Genome.get_level_slices(neuron_counts):
             self.levels.append(Level(
-                neuron_counts[i], neuron_counts[i+1]
+                shape[0], shape[1], parameters[biases], parameters[weights].reshape(shape)
             ))
 
+    def make_private(network):
+        """
+        Gives a network that shares read only parameters, e.g. from the ModelRegistry, its own copy of them
+        so they can be changed. Networks that already own writable parameters are left as they are
+
+        Args:
+            network (NeuralNetwork): The network about to change its parameters
+        """
+
+        if network.parameters.flags.writeable:
+            return
+
+        network.parameters = network.parameters.copy()
+        for level, (biases, weights, shape) in zip(network.levels, Genome.get_level_slices(NeuralNetwork.get_neuron_counts(network))):
+            level.biases = network.parameters[biases]
+            level.weights = network.parameters[weights].reshape(shape)
+
+    def __getstate__(self):
+        # The views of the levels would be copied apart from the buffer, so the network is rebuilt from its buffer
+        return {
+            'neuron_counts': NeuralNetwork.get_neuron_counts(self),
+            'parameters': self.parameters,
+            'signals': [(level.inputs, level.outputs) for level in self.levels]
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state['neuron_counts'], state['parameters'])
+        for level, (inputs, outputs) in zip(self.levels, state['signals']):
+            level.inputs, level.outputs = inputs, outputs
+
     def feed_forward(given_inputs, network):
         """
         Feeds forward the signal of the input nodes to the output nodes
@@ -51,31 +89,61 @@ class NeuralNetwork:
             )
         return outputs
     
-    def mutate(network, amount=1):
+    def mutate(network, amount=1, generator=None):
         """
         Mutates the biases and weights by using linear interpolation
 
         Args:
             network (NeuralNetwork): The network whose biases and weights are mutated
             amount (int): The percent by how much the new values are going to differ; by defaul 1 (100%)
+            generator (Generator): The random generator; by default None to use Genome.generator
         """
 
-        for level in network.levels:
-            for i in range(len(level.biases)):
-                level.biases[i] = Utils.lerp(
-                    level.biases[i],
-                    random.uniform(-1, 1),
-                    amount
-                )
-            for i in range(len(level.weights)):
-                for j in range(len(level.weights[i])):
-                    level.weights[i][j] = Utils.lerp(
-                        level.weights[i][j],
-                        random.uniform(-1, 1),
-                        amount
-                    )
-    
-    def draw_debug(screen, x, width, height, network):
+        NeuralNetwork.make_private(network) # Copy on write of shared parameters
+        Genome.mutate(network.parameters, amount, generator)
+        network.version += 1
+
+    def get_neuron_counts(network):
+        """
+        Gets the amount of neurons of every layer, as passed to the constructor
+
+        Args:
+            network (NeuralNetwork): The network
+
+        Returns:
+            list: The amount of input nodes followed by the amount of output nodes of every level
+        """
+
+        return [len(network.levels[0].inputs)] + [len(level.outputs) for level in network.levels]
+
+    def get_parameters(network):
+        """
+        Copies the biases and weights of every level as one flat array, a compact form of the network
+        that can be sent to other processes
+
+        Args:
+            network (NeuralNetwork): The network whose parameters are copied
+
+        Returns:
+            array: The biases followed by the weights of each level
+        """
+
+        return network.parameters.copy()
+
+    def set_parameters(network, parameters):
+        """
+        Copies a flat array created by get_parameters into the biases and weights of the network
+
+        Args:
+            network (NeuralNetwork): The network receiving the parameters, with the same neuron counts
+            parameters (array): The biases followed by the weights of each level
+        """
+
+        NeuralNetwork.make_private(network)
+        network.parameters[:] = parameters
+        network.version += 1
+
+    def draw_debug(screen, x, width, height, network, changed_only=False):
         """
         Draws a visualization of the network used for debuging and presentation
 
@@ -85,31 +153,37 @@ class NeuralNetwork:
             width (int): The width of the screen for the visualization
             height (int): The height of the screen for the visualization
             network (NeuralNetwork): The neural network which is going to be drawn
+            changed_only (bool): If only the nodes that changed since the last frame are repainted; by default False
+
+        Returns:
+            list: The rectangles of the screen that were drawn on
         """
 
-        pygame.draw.rect(screen, (0, 0, 0), (x, 0, width, height))
-        Visualizer.draw_network(screen, network, width, x)
+        return Visualizer.draw_network(screen, network, width, x, height, changed_only) # Draws the black background along with the cached connections
 
     def save_model(best_car, file_path):
         """
-        Saves the training progress of the neural network
+        Saves the training progress of the neural network, as json or in the binary format if the path ends with ModelFile.extension
 
         Args:
             best_car (Car): The car with the current neural network
-            file_path (str): Path of the json file that stores the model
+            file_path (str): Path of the json or binary file that stores the model
         """
 
+        if ModelFile.is_binary(file_path):
+            ModelFile.save(file_path, best_car.brain.parameters, NeuralNetwork.get_neuron_counts(best_car.brain))
+            print("Saved model!")
+            return
+
         model_data = {'levels': []}
         for level in best_car.brain.levels:
             level_data = {
                 'inputs': level.inputs,
                 'outputs': level.outputs,
-                'weights': level.weights,
-                'biases': level.biases
+                'weights': level.weights.tolist(),
+                'biases': level.biases.tolist()
             }
             model_data['levels'].append(level_data)
-        
-        json_string = json.dumps(model_data, indent=4)
 
         with open(file_path, 'w') as f:
             json.dump(model_data, f)
@@ -117,24 +191,29 @@ class NeuralNetwork:
 
     def load_model(best_car, file_path):
         """
-        Saves the training progress of the neural network
+        Loads the training progress of the neural network, from json or from the binary format if the path ends with ModelFile.extension.
+        Only the biases and weights are loaded, the inputs and outputs are set by the next feed forward
 
         Args:
             best_car (Car): The car to load the network in
-            file_path (str): Path of the json file that stores the model
+            file_path (str): Path of the json or binary file that stores the model
         """
 
         brain = best_car.brain
 
         if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                model_data = json.load(f)
-            
-            for level, level_data in zip(brain.levels, model_data['levels']):
-                level.inputs = level_data['inputs']
-                level.outputs = level_data['outputs']
-                level.weights = level_data['weights']
-                level.biases = level_data['biases']
+            NeuralNetwork.make_private(brain)
+            if ModelFile.is_binary(file_path):
+                genomes, _ = ModelFile.load(file_path)
+                brain.parameters[:] = genomes[0]
+            else:
+                with open(file_path, 'r') as f:
+                    model_data = json.load(f)
+
+                for level, level_data in zip(brain.levels, model_data['levels']):
+                    level.weights[...] = level_data['weights']
+                    level.biases[...] = level_data['biases']
+            brain.version += 1
             print(f"Model loaded from '{file_path}'.")
         else:
             print(f"Model file '{file_path}' does not exist.")
@@ -167,32 +246,34 @@ class Level:
     Args:
         input_count (int): The amount of input nodes for the level
         output_count (int): The amount of output nodes for the level
+        biases (array): The array the biases are stored in, a view of the network parameters; by default None to create one
+        weights (array): The array the weights are stored in with shape (input_count, output_count); by default None to create one
     """
 
-    def __init__(self, input_count, output_count):
+    def __init__(self, input_count, output_count, biases=None, weights=None):
         self.inputs = [None for _ in range(input_count)]
         self.outputs = [None for _ in range(output_count)]
-        self.biases = [None for _ in range(output_count)]
 
-        # For each input node we have #output_count connections which are our weights
-        self.weights = [[None for _ in range(output_count)] for _ in range(input_count)] 
-        
-        Level.randomize(self)
+        # For each input node we have #output_count connections which are our weights
+        if biases is None or weights is None:
+            self.biases = np.empty(output_count, dtype=np.float64)
+            self.weights = np.empty((input_count, output_count), dtype=np.float64)
+            Level.randomize(self)
+        else:
+            self.biases = biases
+            self.weights = weights
 
-    def randomize(level):
+    def randomize(level, generator=None):
         """
         Method that randomizes the biases and weights of the given level
 
         Args:
             level (Level): The level that is going to be randomized
+            generator (Generator): The random generator; by default None to use Genome.generator
         """
 
-        for i in range(len(level.inputs)):
-            for j in range(len(level.outputs)): 
-                level.weights[i][j] = random.uniform(-1, 1) # Negative values to help decide which way to turn 
-        
-        for i in range(len(level.biases)):
-            level.biases[i] = random.uniform(-1, 1)
+        Genome.randomize(level.weights, generator) # Negative values to help decide which way to turn
+        Genome.randomize(level.biases, generator)
 
     def feed_forward(given_inputs, level):
         """
@@ -205,18 +286,13 @@ class Level:
         Returns:
             list: A list of the end result with the corresponding output values of the level, used as input values for the next level
         """
-         
+
         for i in range(len(level.inputs)):
             level.inputs[i] = given_inputs[i]
-        
-        for i in range(len(level.outputs)):
-            sum = 0
-            for j in range(len(level.inputs)):
-                sum += level.inputs[j]*level.weights[j][i]
-            
-            if sum > level.biases[i]:
-                level.outputs[i] = 1 # Turn on the output neuron because the sum of the signals is bigger than the bias
-            else:
-                level.outputs[i] = 0 # turn off the output neuron
 
-        return level.outputs
\ No newline at end of file
+        sums = np.dot(np.asarray(level.inputs, dtype=np.float64), level.weights)
+
+        # Turn on the output neurons where the sum of the signals is bigger than the bias, turn off the others
+        level.outputs = [1 if on else 0 for on in (sums > level.biases).tolist()]
+
+        return level.outputs
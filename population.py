@@ -0,0 +1,216 @@
+import numpy as np
+from car import Car
+from poseTable import PoseTable
+from utils import Utils
+
+class Population:
+    """
+    Class that stores the state of many cars in contiguous arrays so they can all be moved at once.
+    Each car is replaced by a CarView that reads and writes its row of the arrays, so the drawing code keeps working
+
+    Args:
+        cars (list): The cars whose state is moved into the arrays
+
+    Attributes:
+        x (array): The x coordinates of the cars
+        y (array): The y coordinates of the cars
+        width (array): The widths of the cars
+        height (array): The heights of the cars
+        angle (array): The current angles of the cars
+        speed (array): The current speeds of the cars
+        acceleration (array): The accelerations of the cars
+        max_speed (array): The max speeds of the cars
+        friction (array): The friction of the cars
+        rotation_speed (array): The speeds by which the cars can rotate
+        forward (array): If the cars are moving forwards
+        left (array): If the cars are moving to the left
+        right (array): If the cars are moving to the right
+        reverse (array): If the cars are moving backwards
+        dummy (array): If the cars are "DUMMY" cars that always drive forward
+        damaged (array): If the cars are damaged/have crashed or not
+        polygons (array): The corner points of the cars with shape (cars, 4, 2)
+        views (list): The CarView of every car
+    """
+
+    def __init__(self, cars):
+        self.x = np.array([car.x for car in cars], dtype=np.float32)
+        self.y = np.array([car.y for car in cars], dtype=np.float32)
+        self.width = np.array([car.width for car in cars], dtype=np.float32)
+        self.height = np.array([car.height for car in cars], dtype=np.float32)
+        self.angle = np.array([car.angle for car in cars], dtype=np.float32)
+        self.speed = np.array([car.speed for car in cars], dtype=np.float32)
+        self.acceleration = np.array([car.acceleration for car in cars], dtype=np.float32)
+        self.max_speed = np.array([car.max_speed for car in cars], dtype=np.float32)
+        self.friction = np.array([car.friction for car in cars], dtype=np.float32)
+        self.rotation_speed = np.array([car.rotation_speed for car in cars], dtype=np.float32)
+
+        self.forward = np.array([bool(car.controls.forward) for car in cars], dtype=bool)
+        self.left = np.array([bool(car.controls.left) for car in cars], dtype=bool)
+        self.right = np.array([bool(car.controls.right) for car in cars], dtype=bool)
+        self.reverse = np.array([bool(car.controls.reverse) for car in cars], dtype=bool)
+        self.dummy = np.array([car.control_type == "DUMMY" for car in cars], dtype=bool)
+
+        self.damaged = np.array([car.damaged for car in cars], dtype=bool)
+        self.polygons = np.zeros((len(cars), 4, 2), dtype=np.float64)
+
+        self.views = [CarView(self, i, cars[i]) for i in range(len(cars))]
+        self.update_polygons()
+
+    def step(self, indices=None):
+        """
+        Moves and rotates the given cars that are not damaged based on their controls, the same way Car.move does
+
+        Args:
+            indices (array): The indices of the cars to move; by default None to move every car
+        """
+
+        if indices is None:
+            indices = np.arange(len(self.views))
+
+        moving = ~self.damaged[indices]
+        speed = self.speed[indices]
+        acceleration = self.acceleration[indices]
+        max_speed = self.max_speed[indices]
+        friction = self.friction[indices]
+        rotation_speed = self.rotation_speed[indices]
+
+        # Accelerates the cars
+        speed = np.where(self.forward[indices], speed + acceleration, speed)
+        speed = np.where(self.reverse[indices], speed - acceleration, speed)
+
+        # Caps the speed
+        speed = np.minimum(speed, max_speed)
+        speed = np.maximum(speed, -max_speed/2)
+
+        # Adds friction
+        speed = np.where(speed > 0, speed - friction, speed)
+        speed = np.where(speed < 0, speed + friction, speed)
+        speed = np.where(np.abs(speed) < friction, 0, speed).astype(np.float32)
+
+        # Calculates the rotation angle, flipped when driving backwards
+        flip = np.where(speed > 0, 1, -1) * (speed != 0)
+        angle = self.angle[indices] + rotation_speed*flip*self.left[indices] - rotation_speed*flip*self.right[indices]
+
+        # Updates the positions of the cars based on angle and speed, damaged cars stand still
+        radians = np.radians(angle.astype(np.float64))
+        speed = np.where(moving, speed, 0).astype(np.float32)
+        self.angle[indices] = np.where(moving, angle, self.angle[indices])
+        self.speed[indices] = speed
+        self.x[indices] = self.x[indices] - np.sin(radians)*speed
+        self.y[indices] = self.y[indices] - np.cos(radians)*speed
+
+        # Like Controls.handle_controls the dummy cars keep driving forward from the next frame on
+        self.forward[indices] |= self.dummy[indices]
+
+    def update_polygons(self, indices=None):
+        """
+        Calculates the corner points of the given cars, the same way Car.create_polygon does
+
+        Args:
+            indices (array): The indices of the cars to update; by default None to update every car
+        """
+
+        if indices is None:
+            indices = np.arange(len(self.views))
+
+        # The corner offsets come from the pose table, so the traffic that never rotates only gets translated
+        width = self.width[indices]
+        height = self.height[indices]
+        offsets = PoseTable.get_corner_array(width, height, self.angle[indices])
+
+        self.polygons[indices, :, 0] = (self.x[indices] + width.astype(np.float64)/2)[:, np.newaxis] + offsets[:, :, 0]
+        self.polygons[indices, :, 1] = (self.y[indices] + height.astype(np.float64)/2)[:, np.newaxis] + offsets[:, :, 1]
+
+    def check_damaged(self, indices, road_borders, grid=None):
+        """
+        Checks for collisions of the given cars with the road borders and the traffic indexed in the grid,
+        and marks the cars that collided as damaged
+
+        Args:
+            indices (array): The indices of the cars to check
+            road_borders (list): List of the borders on the road
+            grid (SpatialGrid): The grid indexing the traffic by its indices; by default None to only check the borders
+        """
+
+        polygons = self.polygons[indices]
+        hits = np.zeros(len(indices), dtype=bool)
+
+        for border in road_borders:
+            hits |= Utils.boxes_overlap([(point["x"], point["y"]) for point in border], polygons)
+
+        if grid is not None:
+            # Cars whose centers share a band share their candidates, which are at most half a diagonal away
+            y_center = polygons[:, :, 1].mean(axis=1)
+            extent = np.hypot(self.width[indices], self.height[indices]).max()/2 if len(indices) else 0
+            for band, members in grid.group(y_center).items():
+                for traffic_index in grid.query(band*grid.band_height - extent, (band+1)*grid.band_height + extent):
+                    hits[members] |= Utils.boxes_overlap(self.polygons[traffic_index], polygons[members])
+
+        self.damaged[indices] |= hits
+
+def _array_property(name, cast):
+    """
+    Creates a property that reads and writes the row of a CarView in the given Population array
+
+    Args:
+        name (str): The name of the array in the Population
+        cast (type): The Python type the values are returned as
+
+    Returns:
+        property: The property for the CarView class
+    """
+
+    def get(view):
+        return cast(getattr(view.population, name)[view.index])
+
+    def set(view, value):
+        getattr(view.population, name)[view.index] = value
+
+    return property(get, set)
+
+class CarView(Car):
+    """
+    A car whose position, movement and damage live in a row of a Population instead of its own attributes.
+    Everything else, like its sensor and brain, is taken over from the car it replaces. Its controls are not
+    read by Population.step, which uses the control arrays instead
+
+    Args:
+        population (Population): The population storing the state
+        index (int): The row of the car in the population
+        car (Car): The car that is replaced by the view
+
+    Attributes:
+        population (Population): The population storing the state
+        index (int): The row of the car in the population
+    """
+
+    x = _array_property('x', float)
+    y = _array_property('y', float)
+    width = _array_property('width', float)
+    height = _array_property('height', float)
+    angle = _array_property('angle', float)
+    speed = _array_property('speed', float)
+    acceleration = _array_property('acceleration', float)
+    max_speed = _array_property('max_speed', float)
+    friction = _array_property('friction', float)
+    rotation_speed = _array_property('rotation_speed', float)
+    damaged = _array_property('damaged', bool)
+
+    def __init__(self, population, index, car):
+        self.population = population
+        self.index = index
+
+        for name, value in car.__dict__.items():
+            if not hasattr(CarView, name):
+                self.__dict__[name] = value
+
+        if hasattr(self, 'sensor'):
+            self.sensor.car = self
+
+    @property
+    def polygon(self):
+        return [{"x":x, "y":y} for x, y in self.population.polygons[self.index].tolist()]
+
+    @polygon.setter
+    def polygon(self, points):
+        self.population.polygons[self.index] = [(point["x"], point["y"]) for point in points]
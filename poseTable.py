@@ -0,0 +1,121 @@
+import math
+import numpy as np
+
+class PoseTable:
+    """
+    Cache of the trigonometry that only depends on the size, sensor settings and angle of a car.
+    Since cars steer in fixed steps of their rotation speed only a few angles ever occur, so once a pose is
+    in the table, a car polygon or its rays are just a lookup plus a translation to the car position
+
+    Attributes:
+        corners (dict): The corner offsets from the car center, keyed by (width, height, angle)
+        rays (dict): The ray end offsets, keyed by (ray_count, ray_length, ray_spread, angle)
+        max_size (int): The amount of entries after which a table is cleared
+    """
+
+    corners = {}
+    rays = {}
+    max_size = 4096
+
+    def get_corners(width, height, angle):
+        """
+        Gets the offsets of the four corner points from the center of a car, as used by Car.create_polygon
+
+        Args:
+            width (float): The width of the car
+            height (float): The height of the car
+            angle (float): The angle of the car in degrees
+
+        Returns:
+            list: The (x, y) offset of each corner from the center of the car
+        """
+
+        key = (width, height, angle)
+        offsets = PoseTable.corners.get(key)
+        if offsets is None:
+            rad = math.hypot(width, height)/2 # Since the car is a rectangle we can simply get the hypothenuse and half it to get the "radius" from the center to each corner
+            alpha = math.atan2(width, height)
+            radians = math.radians(angle)
+
+            offsets = [
+                (-math.sin(radians-alpha)*rad, -math.cos(radians-alpha)*rad),
+                (-math.sin(radians+alpha)*rad, -math.cos(radians+alpha)*rad),
+                (-math.sin(math.pi+radians-alpha)*rad, -math.cos(math.pi+radians-alpha)*rad),
+                (-math.sin(math.pi+radians+alpha)*rad, -math.cos(math.pi+radians+alpha)*rad)
+            ]
+
+            if len(PoseTable.corners) >= PoseTable.max_size:
+                PoseTable.corners.clear()
+            PoseTable.corners[key] = offsets
+        return offsets
+
+    def get_ray_ends(ray_count, ray_length, ray_spread, angle):
+        """
+        Gets the offsets of the ray end points, as used by Sensor.cast_rays. The x offsets are relative to the center
+        of the car and the y offsets to the top of the car
+
+        Args:
+            ray_count (int): Amount of rays
+            ray_length (int): How far the rays reach
+            ray_spread (float): The angle between the outer rays
+            angle (float): The angle of the car in degrees
+
+        Returns:
+            list: The (x, y) offset of each ray end
+        """
+
+        key = (ray_count, ray_length, ray_spread, angle)
+        offsets = PoseTable.rays.get(key)
+        if offsets is None:
+            offsets = []
+            for i in range(ray_count):
+                # Get the angle of the ray by linear interpolation and adding the car angle to it
+                t = i / (ray_count-1) if ray_count != 1 else 0.5
+                ray_angle = ray_spread/2 + (-ray_spread/2 - ray_spread/2)*t + math.radians(angle)
+                offsets.append((-math.sin(ray_angle)*ray_length, -math.cos(ray_angle)*ray_length))
+
+            if len(PoseTable.rays) >= PoseTable.max_size:
+                PoseTable.rays.clear()
+            PoseTable.rays[key] = offsets
+        return offsets
+
+    def get_corner_array(widths, heights, angles):
+        """
+        Looks up the corner offsets of many cars at once. Every distinct pose only goes through the table once
+
+        Args:
+            widths (array): The widths of the cars
+            heights (array): The heights of the cars
+            angles (array): The angles of the cars in degrees
+
+        Returns:
+            array: The corner offsets from the car centers with shape (cars, 4, 2)
+        """
+
+        offsets = np.empty((len(angles), 4, 2), dtype=np.float64)
+
+        # Cars usually share only a few sizes, so the distinct angles are looked up per size
+        for width, height in set(zip(widths.tolist(), heights.tolist())):
+            members = (widths == width) & (heights == height)
+            unique, inverse = np.unique(angles[members], return_inverse=True)
+            table = np.array([PoseTable.get_corners(width, height, angle) for angle in unique.tolist()], dtype=np.float64)
+            offsets[members] = table[inverse.reshape(-1)]
+        return offsets
+
+    def get_ray_array(sensor, angles):
+        """
+        Looks up the ray end offsets of many cars sharing the same sensor settings at once
+
+        Args:
+            sensor (Sensor): The sensor whose ray settings all cars share
+            angles (array): The angles of the cars in degrees
+
+        Returns:
+            array: The ray end offsets with shape (cars, rays, 2)
+        """
+
+        unique, inverse = np.unique(np.asarray(angles, dtype=np.float64), return_inverse=True)
+        table = np.array([
+            PoseTable.get_ray_ends(sensor.ray_count, sensor.ray_length, sensor.ray_spread, angle) for angle in unique.tolist()
+        ], dtype=np.float64).reshape(-1, sensor.ray_count, 2)
+        return table[inverse.reshape(-1)]
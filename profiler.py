@@ -0,0 +1,150 @@
+import csv
+import time
+from collections import deque
+import pygame
+
+class FrameProfiler:
+    """
+    Class that measures how long each phase of a frame takes. A frame is split into phases by marking the end of each one,
+    the time since the previous mark is booked on the named phase. The last frames are kept for a rolling breakdown
+    that can be drawn as an overlay, and every frame can be streamed to a csv file. While disabled every call returns
+    right away, so the marks can stay in the game loop
+
+    Args:
+        visible (bool): If the overlay is shown, which enables the profiler; by default False
+        window (int): The amount of frames the rolling breakdown is taken over; by default 120
+        csv_path (str): Path of the csv file every frame is written to, which also enables the profiler; by default None
+        measure (bool): If the frames are measured even without overlay or csv file, e.g. for the TrainingMetrics; by default False
+
+    Attributes:
+        visible (bool): If the overlay is shown
+        measure (bool): If the frames are measured even without overlay or csv file
+        enabled (bool): If the frames are measured, because the overlay is shown, they are written to a csv file or measure is set
+        totals (dict): The nanoseconds spent in each phase over all measured frames
+        history (deque): The nanoseconds of each phase of the last frames
+        current (dict): The nanoseconds of each phase of the frame being measured
+        last (int): The time of the last mark in nanoseconds
+        frame (int): The amount of frames measured so far
+        csv_file (file): The open csv file, None if the frames are not streamed
+        csv_writer (writer): The writer of the csv rows
+        columns (list): The phases written to the csv file, taken from the first measured frame
+        font (Font): The font of the overlay, created when it is first drawn
+    """
+
+    def __init__(self, visible=False, window=120, csv_path=None, measure=False):
+        self.visible = visible
+        self.measure = measure
+        self.enabled = visible or measure or csv_path is not None
+        self.totals = {}
+        self.history = deque(maxlen=window)
+        self.current = {}
+        self.last = 0
+        self.frame = 0
+        self.csv_file = None
+        self.csv_writer = None
+        self.columns = None
+        self.font = None
+
+        if csv_path is not None:
+            self.csv_file = open(csv_path, 'w', newline='')
+            self.csv_writer = csv.writer(self.csv_file)
+
+    def start_frame(self):
+        """
+        Starts measuring a new frame
+        """
+
+        if not self.enabled:
+            return
+        self.current = {}
+        self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        """
+        Ends a phase of the frame and books the time since the previous mark on it
+
+        Args:
+            phase (str): The name of the phase that just ended
+        """
+
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.current[phase] = self.current.get(phase, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        """
+        Finishes the measured frame, adding it to the rolling breakdown and the csv file
+        """
+
+        if not self.enabled or not self.current:
+            return
+
+        self.history.append(self.current)
+        for phase, nanoseconds in self.current.items():
+            self.totals[phase] = self.totals.get(phase, 0) + nanoseconds
+        if self.csv_writer is not None:
+            if self.columns is None:
+                self.columns = list(self.current)
+                self.csv_writer.writerow(['frame'] + self.columns + ['total'])
+            self.csv_writer.writerow([self.frame] + [self.current.get(phase, 0) for phase in self.columns] + [sum(self.current.values())])
+        self.frame += 1
+
+    def toggle(self):
+        """
+        Shows or hides the overlay, measuring only while it is shown or a csv file is written. The rolling breakdown starts over
+        """
+
+        self.visible = not self.visible
+        self.enabled = self.visible or self.measure or self.csv_writer is not None
+        self.history.clear()
+
+    def get_averages(self):
+        """
+        Calculates the average time of every phase over the rolling window
+
+        Returns:
+            dict: The average milliseconds of each phase, keyed by its name
+        """
+
+        totals = {}
+        for frame in self.history:
+            for phase, nanoseconds in frame.items():
+                totals[phase] = totals.get(phase, 0) + nanoseconds
+        return {phase: total / len(self.history) / 1e6 for phase, total in totals.items()}
+
+    def draw(self, screen, x, y):
+        """
+        Draws the rolling breakdown of the phases as a list of average milliseconds
+
+        Args:
+            screen (Surface): The surface to draw on
+            x (int): The x coordinate of the top left corner of the overlay
+            y (int): The y coordinate of the top left corner of the overlay
+
+        Returns:
+            list: The rectangles of the screen that were drawn on
+        """
+
+        if not self.visible or not self.history:
+            return []
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+
+        averages = self.get_averages()
+        lines = [f"{phase}: {milliseconds:.2f} ms" for phase, milliseconds in averages.items()]
+        lines.append(f"total: {sum(averages.values()):.2f} ms")
+
+        return [screen.blit(self.font.render(line, True, (255, 255, 255), (0, 0, 0)), (x, y + i*18)) for i, line in enumerate(lines)]
+
+    def close(self):
+        """
+        Closes the csv file
+        """
+
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
+            self.enabled = self.visible or self.measure
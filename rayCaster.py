@@ -0,0 +1,146 @@
+import numpy as np
+from poseTable import PoseTable
+
+class RayCaster:
+    """
+    Class responsible for casting the sensor rays of a whole population at once.
+    Every ray of every agent is tested against every obstacle segment in one vectorized pass
+    using the same segment intersection as Utils.get_intersection
+    """
+
+    def cast_rays(population, indices, sensor):
+        """
+        Calculates the start and end points of the rays of every car, the same way Sensor.cast_rays does
+
+        Args:
+            population (Population): The population storing the cars
+            indices (array): The indices of the cars with sensors
+            sensor (Sensor): The sensor whose ray settings all cars share
+
+        Returns:
+            array: The start points of the rays with shape (cars, rays, 2)
+            array: The end points of the rays with shape (cars, rays, 2)
+        """
+
+        x = population.x[indices].astype(np.float64)[:, np.newaxis]
+        y = population.y[indices].astype(np.float64)[:, np.newaxis]
+        width = population.width[indices].astype(np.float64)[:, np.newaxis]
+        height = population.height[indices].astype(np.float64)[:, np.newaxis]
+
+        # The ray end offsets only depend on the sensor settings and the car angle so they come from the pose table
+        offsets = PoseTable.get_ray_array(sensor, population.angle[indices])
+
+        # Originate the rays from the center of the car
+        start_x = np.broadcast_to(x + width/2, offsets.shape[:2])
+        start_y = np.broadcast_to(y + height/2, offsets.shape[:2])
+        end_x = (x + width/2) + offsets[:, :, 0]
+        end_y = y + offsets[:, :, 1]
+
+        return np.stack((start_x, start_y), axis=-1), np.stack((end_x, end_y), axis=-1)
+
+    def get_segments(road_borders, polygons):
+        """
+        Collects the segments of all obstacles the rays can hit
+
+        Args:
+            road_borders (list): List of the borders of the road
+            polygons (array): The corner points of the traffic cars with shape (cars, corners, 2)
+
+        Returns:
+            array: The start and end points of every segment with shape (segments, 2, 2)
+        """
+
+        borders = np.array([[(border[0]["x"], border[0]["y"]), (border[1]["x"], border[1]["y"])] for border in road_borders], dtype=np.float64).reshape(-1, 2, 2)
+        edges = np.stack((polygons, np.roll(polygons, -1, axis=1)), axis=2).reshape(-1, 2, 2)
+        return np.concatenate((borders, edges))
+
+    def get_offsets(starts, ends, segments):
+        """
+        Intersects every ray with every segment and keeps the smallest offset of each ray
+
+        Args:
+            starts (array): The start points of the rays with shape (..., 2)
+            ends (array): The end points of the rays with shape (..., 2)
+            segments (array): The obstacle segments with shape (segments, 2, 2)
+
+        Returns:
+            array: The smallest offset of every ray with the shape of the rays, 1 if the ray does not hit anything
+        """
+
+        offsets = np.ones(starts.shape[:-1], dtype=np.float64)
+        if len(segments) == 0:
+            return offsets
+
+        # Ray points A-B against segment points C-D, broadcast to (..., segments)
+        Ax, Ay = starts[..., 0, np.newaxis], starts[..., 1, np.newaxis]
+        Bx, By = ends[..., 0, np.newaxis], ends[..., 1, np.newaxis]
+        Cx, Cy = segments[:, 0, 0], segments[:, 0, 1]
+        Dx, Dy = segments[:, 1, 0], segments[:, 1, 1]
+
+        t_Top = (Dx-Cx)*(Ay-Cy)-(Dy-Cy)*(Ax-Cx)
+        u_Top = (Cy-Ay)*(Ax-Bx)-(Cx-Ax)*(Ay-By)
+        bottom = (Dy-Cy)*(Bx-Ax)-(Dx-Cx)*(By-Ay)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = t_Top/bottom
+            u = u_Top/bottom
+        hit = (bottom != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+
+        return np.minimum(offsets, np.where(hit, t, np.inf).min(axis=-1))
+
+    def read_sensors(population, indices, sensor, road_borders, traffic_indices, grid=None):
+        """
+        Casts the rays of every car and reads the offsets to the closest obstacles.
+        With a SpatialGrid the cars are grouped by band and only tested against the traffic within reach of their band
+
+        Args:
+            population (Population): The population storing the cars and the traffic
+            indices (array): The indices of the cars with sensors
+            sensor (Sensor): The sensor whose ray settings all cars share
+            road_borders (list): List of the borders of the road
+            traffic_indices (array): The indices of the traffic cars
+            grid (SpatialGrid): The grid indexing the traffic by its indices; by default None to test against all traffic
+
+        Returns:
+            array: The offsets with shape (cars, rays), 1 if a ray does not hit anything
+            array: The start points of the rays with shape (cars, rays, 2)
+            array: The end points of the rays with shape (cars, rays, 2)
+        """
+
+        starts, ends = RayCaster.cast_rays(population, indices, sensor)
+        if grid is None:
+            segments = RayCaster.get_segments(road_borders, population.polygons[traffic_indices])
+            return RayCaster.get_offsets(starts, ends, segments), starts, ends
+
+        # A ray reaches at most its length plus half the car height away from the car center
+        reach = sensor.ray_length + float(population.height[indices].max())/2 if len(indices) else 0
+
+        offsets = np.ones(starts.shape[:-1], dtype=np.float64)
+        for band, members in grid.group(starts[:, 0, 1]).items():
+            nearby = grid.query(band*grid.band_height - reach, (band+1)*grid.band_height + reach)
+            segments = RayCaster.get_segments(road_borders, population.polygons[nearby])
+            offsets[members] = RayCaster.get_offsets(starts[members], ends[members], segments)
+        return offsets, starts, ends
+
+    def write_back(sensor, offsets, starts, ends):
+        """
+        Stores the rays and detections of one car in its sensor, so they can be drawn
+
+        Args:
+            sensor (Sensor): The sensor receiving the values
+            offsets (array): The offsets of the car's rays
+            starts (array): The start points of the car's rays
+            ends (array): The end points of the car's rays
+        """
+
+        sensor.rays = []
+        sensor.detections = []
+        for offset, start, end in zip(offsets.tolist(), starts.tolist(), ends.tolist()):
+            sensor.rays.append([{"x":start[0], "y":start[1]}, {"x":end[0], "y":end[1]}])
+            if offset < 1:
+                sensor.detections.append({
+                    "x":start[0]+(end[0]-start[0])*offset,
+                    "y":start[1]+(end[1]-start[1])*offset,
+                    "offset":offset})
+            else:
+                sensor.detections.append(None)
@@ -1,3 +1,4 @@
+import math
 import pygame
 from utils import Utils
 
@@ -31,7 +32,12 @@ class Road:
         bottom_right (dict): The coordinates of the bottom right corner point of the road
         bottom_left (dict): The coordinates of the bottom left corner point of the road
         borders (list): List of the corner points of the road
+        drawn_scroll (float): The scroll the road was drawn at the last time, None if it was not drawn yet
+        tiles (dict): The drawn tiles of the road shared by all roads, keyed by their shape and the screen size
     """
+
+    tiles = {}
+
     def __init__(self, x, width, line_x, height, lane_count=2):
         self.x = x
         self.width = width
@@ -50,6 +56,7 @@ class Road:
 
         self.scroll = 0
         self.scroll_speed = 0
+        self.drawn_scroll = None
 
         top_left = {"x":self.left, "y":self.top}
         top_right = {"x":self.right, "y":self.top}
@@ -78,43 +85,100 @@ class Road:
 
     def draw(self, screen):
         """
-        Responsible for drawing the road along its lane lines on the screen
+        Responsible for drawing the road along its lane lines on the screen. The road only moves by the scroll,
+        so it is drawn once to a tile that is one dash period taller than the road and blitted shifted by the scroll
 
         Args:
             screen (Surface): The surface on which to draw the road on
+
+        Returns:
+            list: The rectangles of the screen that look different than at the last draw
         """
 
-        line_width = 5
+        tile = Road.get_tile(self, screen)
 
-        # Draws the road itself
-        road = pygame.draw.rect(screen, (169, 169, 169), (self.x, 0, self.width, self.height))
-       
-       # Draw the dashed lines
-        for i in range(self.lane_count + 1):
-            # Uses linear interpolation to determine the x value of the dashed lines
-            x = Utils.lerp(
-                self.left, 
-                self.right,
-                i / self.lane_count
-            )
-        
-            y = self.scroll % (self.dash_length + self.dash_gap) - self.dash_length - self.dash_gap
-            while y < self.height:
-                pygame.draw.line(screen, (255, 255, 255), (x, y), (x, y + self.dash_length), line_width)
-                y += self.dash_length + self.dash_gap
-        
-        # Draw the border lines
-        for border in self.borders:
-            pygame.draw.line(screen, (255, 255, 255), (border[0]["x"], border[0]["y"]), (border[1]["x"], (border[1]["y"])), line_width)
+        # The dashes repeat every period, so shifting the tile by the scroll within one period moves them along
+        period = self.dash_length + self.dash_gap
+        y = math.floor(self.scroll % period - period)
+        area = screen.blit(tile, (int(self.x), 0), pygame.Rect(0, -y, tile.get_width(), self.height))
+
+        # Only the dashed lane lines move with the scroll, the road and its borders stay in place
+        if self.drawn_scroll is None:
+            rects = [area]
+        elif self.drawn_scroll != self.scroll:
+            rects = Road.get_line_rects(self)
+        else:
+            rects = []
+        self.drawn_scroll = self.scroll
 
         # Simulates the scroll effect
         self.scroll += self.scroll_speed
         if self.scroll >= self.dash_length + self.dash_gap:
             self.scroll = 0
-            
-           
-            
 
+        return rects
+
+    def get_line_rects(self, line_width=5):
+        """
+        Gets the rectangles covering the dashed lines between the lanes, which are the only part of the road that scrolls
+
+        Args:
+            line_width (int): The width of the lines; by default 5
+
+        Returns:
+            list: A rectangle of the road height around every dashed line
+        """
+
+        rects = []
+        for i in range(1, self.lane_count):
+            x = Utils.lerp(self.left, self.right, i / self.lane_count)
+            rects.append(pygame.Rect(int(x) - line_width, 0, 2*line_width + 1, self.height))
+        return rects
+
+    def get_tile(road, screen):
+        """
+        Gets the tile of the road, drawing it only if no road of the same shape was drawn on a screen of the same size before
+
+        Args:
+            road (Road): The road whose tile is drawn
+            screen (Surface): The surface the road is drawn on
+
+        Returns:
+            Surface: The road with its lane and border lines, starting with a dash at the top
+        """
 
+        key = (road.x, road.width, road.height, road.left, road.right, road.lane_count, road.dash_length, road.dash_gap, screen.get_size())
+        tile = Road.tiles.get(key)
+        if tile is not None:
+            return tile
 
+        line_width = 5
+        period = road.dash_length + road.dash_gap
+        height = road.height + period
+
+        # Draws the road itself, the tile starts at the whole pixel the road starts at so the lines land on the same pixels as on the screen
+        area = pygame.Rect(road.x, 0, road.width, height)
+        tile = pygame.Surface(area.size)
+        tile.fill((169, 169, 169))
+        left = area.x
+
+        # Draw the dashed lines
+        for i in range(road.lane_count + 1):
+            # Uses linear interpolation to determine the x value of the dashed lines
+            x = Utils.lerp(
+                road.left, 
+                road.right,
+                i / road.lane_count
+            ) - left
+
+            y = 0
+            while y < height:
+                pygame.draw.line(tile, (255, 255, 255), (x, y), (x, y + road.dash_length), line_width)
+                y += period
+
+        # Draw the border lines
+        for border in road.borders:
+            pygame.draw.line(tile, (255, 255, 255), (border[0]["x"] - left, 0), (border[1]["x"] - left, height), line_width)
 
+        Road.tiles[key] = tile
+        return tile
@@ -0,0 +1,92 @@
+import os
+import random
+from car import Car
+from modelRegistry import ModelRegistry
+from neuralNet import NeuralNetwork
+from road import Road
+
+# car screen settings
+SCREEN_HEIGHT = 800
+SCREEN_WIDTH = 1100
+SCREEN_BGCOLOR = (100, 100, 100)
+
+# Road settings
+ROAD_WIDTH = SCREEN_WIDTH/3
+ROAD_CENTER = 50
+LINE_CENTER = ROAD_WIDTH/2 + ROAD_CENTER
+
+def create_road():
+    """
+    Creates the road used by the simulation
+
+    Returns:
+        Road: The road with three lanes fitted to the screen
+    """
+
+    return Road(ROAD_CENTER, ROAD_WIDTH, LINE_CENTER, SCREEN_HEIGHT, 3)
+
+def generate_cars(n, road, car_type):
+    """
+    Generates n amount of cars
+
+    Args:
+        n (int): The amount of cars to be generated
+        road (Road): The road of the simulation
+        car_type (str): Type of car to generate (DUMMY/AGENT)
+
+    Returns:
+        list: The cars in the traffic
+    """
+
+    cars = []
+    for i in range(n+1):
+
+        if car_type == "DUMMY":
+            cars.append(Car(road.get_lane_center(random.randrange(0, 2), 30), random.randrange(0, 550), 30, 50, "DUMMY"))
+        elif car_type == "AGENT":
+            cars.append(Car(road.get_lane_center(1, 30), 600, 30, 50, "AGENT", 5))
+
+    return cars
+
+def generate_traffic(road):
+    """
+    Generates the fixed traffic scenario the agents are trained on
+
+    Args:
+        road (Road): The road of the simulation
+
+    Returns:
+        list: The cars in the traffic
+    """
+
+    return [
+        Car(road.get_lane_center(0, 30), 500, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(0, 30), 100, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(1, 30), 800, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(2, 30), 500, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(2, 30), 300, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(1, 30), 1100, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(1, 30), 700, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(0, 30), 1200, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(0, 30), 100, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(1, 30), -500, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(2, 30), -300, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(2, 30), -200, 30, 50, "DUMMY"),
+        Car(road.get_lane_center(1, 30), 300, 30, 50, "DUMMY")
+    ]
+
+def load_brains(cars, file_path):
+    """
+    Loads the saved model into the agents and mutates all of them except the first one.
+    The model is only read once and the first agent keeps sharing its parameters with the registry
+
+    Args:
+        cars (list): The agent cars
+        file_path (str): Path of the json or binary file that stores the model
+    """
+
+    if os.path.exists(file_path):
+        for i in range(0, len(cars)):
+            cars[i].brain = ModelRegistry.create_network(file_path)
+            if i > 0:
+                NeuralNetwork.mutate(cars[i].brain, 0.2)
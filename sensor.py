@@ -1,6 +1,7 @@
 import pygame
 import math
 from utils import Utils
+from poseTable import PoseTable
 
 class Sensor:
     """
@@ -94,21 +95,14 @@ class Sensor:
         "Casts" a ray by creating segments using calculated start and end points
         """
 
+        start = {"x":self.car.x+(self.car.width/2), "y":self.car.y+(self.car.height/2)} # Originate the ray from the center of the car
+
+        # The end points only depend on the ray settings and the car angle so their offsets are looked up instead of recalculated
         self.rays = []
-        for i in range(self.ray_count):
-            # Get the angle of the ray by linear interpolation and adding the car angle to it
-            ray_angle = Utils.lerp(
-                self.ray_spread / 2, 
-                -self.ray_spread / 2, 
-                i / (self.ray_count-1) if self.ray_count != 1 else 0.5
-            )+math.radians(self.car.angle)
-
-            start = {"x":self.car.x+(self.car.width/2), "y":self.car.y+(self.car.height/2)} # Originate the ray from the center of the car
-            end = {"x":(self.car.x+(self.car.width/2)) - math.sin(ray_angle) * self.ray_length, # Use the pre-defined attributes and the ray angle to determine where the ray "casts" to
-                   "y":self.car.y - math.cos(ray_angle) * self.ray_length} 
-            
+        for dx, dy in PoseTable.get_ray_ends(self.ray_count, self.ray_length, self.ray_spread, self.car.angle):
+            end = {"x":start["x"] + dx, "y":self.car.y + dy}
             self.rays.append([start, end])
-        
+
     def draw(self, screen):
         """
         Draws each ray on the given surface
@@ -0,0 +1,293 @@
+import numpy as np
+from batchNetwork import BatchNetwork
+from population import Population
+from rayCaster import RayCaster
+from spatialGrid import SpatialGrid
+
+class Simulation:
+    """
+    Class that holds the state of a single run and advances it frame by frame without drawing anything.
+    Used by the game loop in main.py as well as by the headless runner so both share exactly the same logic
+
+    Args:
+        road (Road): The road of the simulation
+        cars (list): The agent cars
+        traffic (list): The traffic cars on the road
+        batched (bool): If all cars are simulated together using a Population, the RayCaster and a BatchNetwork; by default True
+        scroll (bool): If the cars are moved along with the road scroll to keep the best car on screen; by default True
+        profiler (FrameProfiler): Measures the phases of each step; by default None
+
+    Attributes:
+        road (Road): The road of the simulation
+        cars (list): The agent cars, CarViews of the population if batched
+        traffic (list): The traffic cars on the road, CarViews of the population if batched
+        grid (SpatialGrid): The broad-phase index of the traffic, rebuilt every frame
+        population (Population): The state of the traffic followed by the agents, None if every car updates itself
+        traffic_indices (array): The indices of the traffic cars in the population
+        agent_indices (array): The indices of the agent cars in the population
+        active_indices (array): The indices of the agent cars in the population that have not crashed yet
+        frozen_indices (array): The indices of the crashed agent cars in the population that follow the scroll
+        crashed_indices (array): The indices of the agent cars in the population that crashed in the last frame
+        batch (BatchNetwork): The stacked networks of the agents, None if every agent feeds its own network
+        active_batch (BatchNetwork): The stacked networks of the agents that have not crashed yet
+        scroll (bool): If the cars are moved along with the road scroll
+        profiler (FrameProfiler): Measures the phases of each step, None if they are not measured
+        scrolled (float): The total scroll applied to the cars so far
+        start_y (list): The y value every agent car started at
+        crash_frames (list): The frame every agent car crashed in, None if it is still driving
+        best_index (int): The position of the best car in cars
+        best_car (Car): The car that got the furthest (smallest y value) in the last frame
+        frame (int): The amount of frames simulated so far
+        agent_steps (int): The amount of agent updates simulated so far, not counting crashed agents
+    """
+
+    def __init__(self, road, cars, traffic, batched=True, scroll=True, profiler=None):
+        self.road = road
+        self.cars = cars
+        self.traffic = traffic
+        self.scroll = scroll
+        self.profiler = profiler
+        self.scrolled = 0
+        self.start_y = [car.y for car in cars]
+        self.crash_frames = [None for _ in cars]
+        self.grid = SpatialGrid()
+        self.population = None
+        self.batch = None
+
+        if batched:
+            self.population = Population(traffic + cars)
+            self.traffic = self.population.views[:len(traffic)]
+            self.cars = self.population.views[len(traffic):]
+            self.traffic_indices = np.arange(len(traffic))
+            self.agent_indices = np.arange(len(traffic), len(traffic) + len(cars))
+            self.active_indices = self.agent_indices[~self.population.damaged[self.agent_indices]]
+            self.frozen_indices = np.array([], dtype=np.int64)
+            self.crashed_indices = np.array([], dtype=np.int64)
+            self.batch = BatchNetwork([car.brain for car in cars])
+            self.active_batch = BatchNetwork.select(self.batch, self.active_indices - len(traffic))
+
+        self.best_index = 0
+        self.best_car = self.cars[0]
+
+        self.frame = 0
+        self.agent_steps = 0
+
+    def step(self):
+        """
+        Advances the simulation by one frame by updating the traffic and agent cars, picking the best car
+        and applying the scroll of the road to the car positions
+        """
+
+        self.agent_steps += self.count_active()
+
+        if self.population is None:
+            self.step_cars()
+        else:
+            self.step_population()
+
+        self.frame += 1
+
+    def step_cars(self):
+        """
+        Advances the simulation by letting every car update itself
+        """
+
+        profiler = self.profiler
+
+        # Update agent and traffic cars
+        for traffic_car in self.traffic:
+            traffic_car.update(self.road.borders, [])
+        self.grid.rebuild(self.traffic)
+        if profiler is not None:
+            profiler.mark("traffic")
+
+        # Every agent only looks at the traffic within its reach, crashed agents are not updated anymore
+        for i in range(len(self.cars)):
+            if not self.cars[i].damaged:
+                self.cars[i].update(self.road.borders, self.grid.query_car(self.cars[i], self.cars[i].sensor.ray_length))
+                if self.cars[i].damaged:
+                    self.crash_frames[i] = self.frame
+            else:
+                self.cars[i].speed = 0
+        if profiler is not None:
+            profiler.mark("agents")
+
+        # Find the car with the minimum y value
+        ys = [car.y for car in self.cars]
+        self.best_index = ys.index(min(ys))
+        self.best_car = self.cars[self.best_index]
+        if profiler is not None:
+            profiler.mark("selection")
+
+        self.road.scroll_speed = self.best_car.speed
+        if not self.scroll:
+            return
+        self.scrolled += self.road.scroll_speed
+
+        # Simulates overtaking effect by adjusting the cars y position relevant to the scroll speed
+        for traffic_car in self.traffic:
+            traffic_car.y += self.road.scroll_speed
+        for i in range(1, len(self.cars)):
+            self.cars[i].y += self.road.scroll_speed
+            if self.cars[i].damaged and self.road.scroll_speed != 0:
+                self.cars[i].polygon = self.cars[i].create_polygon() # The frozen polygon follows the scroll to be drawn in the right place
+        if profiler is not None:
+            profiler.mark("scroll")
+
+    def step_population(self):
+        """
+        Advances the simulation by moving, checking and sensing all cars of the population at once
+        """
+
+        population = self.population
+        traffic_count = len(self.traffic)
+        profiler = self.profiler
+
+        # Agents that crashed in the last frame come to a stand still, like a damaged Car does in its update
+        population.speed[self.crashed_indices] = 0
+        self.crashed_indices = self.crashed_indices[:0]
+
+        # Move the traffic and the agents that have not crashed and check them for collisions, the traffic only with the road borders
+        moving = np.concatenate((self.traffic_indices, self.active_indices))
+        population.step(moving)
+        population.update_polygons(moving)
+        if profiler is not None:
+            profiler.mark("physics")
+
+        traffic_polygons = population.polygons[self.traffic_indices]
+        self.grid.rebuild(self.traffic_indices, traffic_polygons[:, :, 1].min(axis=1), traffic_polygons[:, :, 1].max(axis=1))
+
+        population.check_damaged(self.traffic_indices, self.road.borders)
+        population.check_damaged(self.active_indices, self.road.borders, self.grid)
+
+        # Crashed agents leave the active set and keep their final state for drawing and selection
+        alive = ~population.damaged[self.active_indices]
+        if not alive.all():
+            self.crashed_indices = self.active_indices[~alive]
+            for i in (self.crashed_indices - traffic_count).tolist():
+                self.crash_frames[i] = self.frame
+            self.active_indices = self.active_indices[alive]
+            self.active_batch = BatchNetwork.select(self.batch, self.active_indices - traffic_count)
+            self.frozen_indices = np.setdiff1d(self.agent_indices[1:], self.active_indices)
+        if profiler is not None:
+            profiler.mark("collisions")
+
+        # Find the car with the minimum y value
+        best_index = int(np.argmin(population.y[self.agent_indices]))
+        self.best_index = best_index
+        self.best_car = self.cars[best_index]
+
+        # Read the sensors and feed forward the networks of all active agents at once
+        sensor = self.cars[0].sensor
+        if len(self.active_indices):
+            offsets, starts, ends = RayCaster.read_sensors(population, self.active_indices, sensor, self.road.borders, self.traffic_indices, self.grid)
+            if profiler is not None:
+                profiler.mark("sensing")
+            outputs = BatchNetwork.feed_forward(1 - offsets, self.active_batch) > 0
+
+            population.forward[self.active_indices] = outputs[:, 0]
+            population.left[self.active_indices] = outputs[:, 1]
+            population.right[self.active_indices] = outputs[:, 2]
+            population.reverse[self.active_indices] = outputs[:, 3]
+
+        # The best car is drawn with its sensor and network so their values are copied back from the batch.
+        # If it has crashed already it is read on its own since it is not part of the active set
+        row = int(np.searchsorted(self.active_indices, self.agent_indices[best_index]))
+        if row < len(self.active_indices) and self.active_indices[row] == self.agent_indices[best_index]:
+            batch = self.active_batch
+        else:
+            row = 0
+            offsets, starts, ends = RayCaster.read_sensors(population, self.agent_indices[[best_index]], sensor, self.road.borders, self.traffic_indices, self.grid)
+            batch = BatchNetwork.select(self.batch, [best_index])
+            BatchNetwork.feed_forward(1 - offsets, batch)
+
+        RayCaster.write_back(self.best_car.sensor, offsets[row], starts[row], ends[row])
+        BatchNetwork.write_back(batch, row, self.best_car.brain)
+        if profiler is not None:
+            profiler.mark("inference")
+
+        scroll_speed = population.speed[self.agent_indices[best_index]]
+        self.road.scroll_speed = float(scroll_speed)
+        if not self.scroll:
+            return
+        self.scrolled += self.road.scroll_speed
+
+        # Simulates overtaking effect by adjusting the cars y position relevant to the scroll speed.
+        # The frozen polygons of crashed agents follow the scroll to be drawn in the right place
+        population.y[self.traffic_indices] += scroll_speed
+        population.y[self.agent_indices[1:]] += scroll_speed
+        population.polygons[self.frozen_indices, :, 1] += scroll_speed
+        if profiler is not None:
+            profiler.mark("scroll")
+
+    def get_polygons(self):
+        """
+        Gets the corner points of all cars, e.g. to find the parts of the screen they cover
+
+        Returns:
+            array: The corner points of the traffic cars with shape (traffic, 4, 2)
+            array: The corner points of the agent cars with shape (agents, 4, 2)
+        """
+
+        if self.population is None:
+            return tuple(np.array([[(point["x"], point["y"]) for point in car.polygon] for car in cars], dtype=np.float64).reshape(-1, 4, 2)
+                         for cars in (self.traffic, self.cars))
+        return self.population.polygons[self.traffic_indices], self.population.polygons[self.agent_indices]
+
+    def get_distances(self):
+        """
+        Calculates how far every agent car drove, leaving out the scroll so the result does not depend
+        on which car was the best one. This is the fitness behind picking the car with the smallest y value
+
+        Returns:
+            list: The distance driven by every agent car
+        """
+
+        # The first car is never moved along with the scroll
+        return [self.start_y[i] - self.cars[i].y + (self.scrolled if i > 0 else 0) for i in range(len(self.cars))]
+
+    def get_best_distance(self):
+        """
+        Calculates how far the best car drove, the same way as get_distances
+
+        Returns:
+            float: The distance driven by the best car
+        """
+
+        return self.start_y[self.best_index] - self.best_car.y + (self.scrolled if self.best_index > 0 else 0)
+
+    def rank_cars(self):
+        """
+        Orders the agent cars by the criterion used to pick the best car, the smallest y value first
+
+        Returns:
+            array: The positions in cars from the best to the worst car
+        """
+
+        if self.population is None:
+            ys = np.array([car.y for car in self.cars])
+        else:
+            ys = self.population.y[self.agent_indices]
+        return np.argsort(ys, kind='stable')
+
+    def count_active(self):
+        """
+        Counts the agent cars that have not crashed yet
+
+        Returns:
+            int: The amount of agents still driving
+        """
+
+        if self.population is None:
+            return sum(1 for car in self.cars if not car.damaged)
+        return len(self.active_indices)
+
+    def all_damaged(self):
+        """
+        Checks if every agent car has crashed
+
+        Returns:
+            bool: True if there is no agent left driving
+        """
+
+        return self.count_active() == 0
@@ -0,0 +1,107 @@
+import math
+import numpy as np
+
+class SpatialGrid:
+    """
+    Broad-phase index that sorts cars into horizontal bands of the road by their y value.
+    Since the road only stretches vertically, looking up the bands around a car is enough to find every
+    obstacle it could collide with or see, instead of testing the whole traffic
+
+    Args:
+        band_height (int): The height of each band; by default 100
+
+    Attributes:
+        band_height (int): The height of each band
+        cars (list): The indexed cars, or their indices in a Population
+        bands (dict): The positions in cars stored in each band, keyed by the band index
+    """
+
+    def __init__(self, band_height=100):
+        self.band_height = band_height
+        self.cars = []
+        self.bands = {}
+
+    def get_band(self, y):
+        """
+        Gets the index of the band containing the given y value
+
+        Args:
+            y (float): The y value
+
+        Returns:
+            int: The index of the band
+        """
+
+        return math.floor(y / self.band_height)
+
+    def rebuild(self, cars, tops=None, bottoms=None):
+        """
+        Sorts the cars into every band they overlap. Called once per frame after the cars moved
+
+        Args:
+            cars (list): The cars to index, usually the traffic, or their indices in a Population
+            tops (list): The smallest y value of every car; by default taken from the car polygons
+            bottoms (list): The biggest y value of every car; by default taken from the car polygons
+        """
+
+        self.cars = cars
+        self.bands = {}
+        for i in range(len(cars)):
+            if tops is None:
+                ys = [point["y"] for point in cars[i].polygon]
+                top, bottom = min(ys), max(ys)
+            else:
+                top, bottom = tops[i], bottoms[i]
+
+            for band in range(self.get_band(top), self.get_band(bottom)+1):
+                self.bands.setdefault(band, []).append(i)
+
+    def query(self, top, bottom):
+        """
+        Finds the cars stored in the bands between top and bottom
+
+        Args:
+            top (float): The smallest y value of the area
+            bottom (float): The biggest y value of the area
+
+        Returns:
+            list: The cars that may overlap the area, each only once
+        """
+
+        found = set()
+        for band in range(self.get_band(top), self.get_band(bottom)+1):
+            found.update(self.bands.get(band, ()))
+        return [self.cars[i] for i in sorted(found)]
+
+    def query_car(self, car, reach=0):
+        """
+        Finds the cars that may be within reach of the given car, whatever its rotation. The car is queried
+        before it moves, so its max speed is added to the reach to cover where it ends up in the frame
+
+        Args:
+            car (Car): The car to look around
+            reach (float): How far beyond its own corners the car needs to look, e.g. its ray length; by default 0
+
+        Returns:
+            list: The cars that may be within reach
+        """
+
+        y_center = car.y + car.height/2
+        extent = math.hypot(car.width, car.height)/2 + reach + car.max_speed
+        return self.query(y_center - extent, y_center + extent)
+
+    def group(self, ys):
+        """
+        Groups positions by the band they fall into, so a whole group can share one query
+
+        Args:
+            ys (array): The y values to group
+
+        Returns:
+            dict: The positions in ys falling into each band, keyed by the band index
+        """
+
+        bands = np.floor(np.asarray(ys, dtype=np.float64) / self.band_height).astype(np.int64)
+        order = np.argsort(bands, kind='stable')
+        unique, first = np.unique(bands[order], return_index=True)
+        return dict(zip(unique.tolist(), np.split(order, first[1:])))
@@ -0,0 +1,59 @@
+import os
+import stat
+import numpy as np
+from checkpointer import Checkpointer
+from modelFile import ModelFile
+from neuralNet import NeuralNetwork
+
+NEURON_COUNTS = [5, 6, 4]
+
+def write_checkpoint(directory, generation):
+    path = os.path.join(directory, f"generation-{generation:06d}{ModelFile.extension}")
+    ModelFile.save(path, np.zeros((2, NeuralNetwork(NEURON_COUNTS).parameters.size)), NEURON_COUNTS)
+    return path
+
+def test_new_run_numbers_on_from_earlier_checkpoints(tmp_path):
+    old = [write_checkpoint(tmp_path, generation) for generation in (29, 39)]
+
+    checkpointer = Checkpointer(str(tmp_path), keep=5, every=10)
+    networks = [NeuralNetwork(NEURON_COUNTS) for _ in range(3)]
+    checkpointer.on_generation_end(9, networks)
+    checkpointer.flush()
+
+    newest = os.path.join(tmp_path, f"generation-000049{ModelFile.extension}")
+    assert all(os.path.exists(path) for path in old)
+    assert Checkpointer.latest(str(tmp_path)) == newest
+    genomes, _ = ModelFile.load(newest)
+    assert np.allclose(genomes[0], networks[0].parameters.astype(np.float32))
+
+def test_rotation_keeps_the_newest_across_runs(tmp_path):
+    for generation in (29, 39):
+        write_checkpoint(tmp_path, generation)
+
+    checkpointer = Checkpointer(str(tmp_path), keep=2, every=10)
+    checkpointer.on_generation_end(9, [NeuralNetwork(NEURON_COUNTS)])
+    checkpointer.flush()
+
+    names = sorted(os.listdir(tmp_path))
+    assert names == [f"generation-000039{ModelFile.extension}", f"generation-000049{ModelFile.extension}"]
+
+def test_saved_model_gets_the_default_permissions(tmp_path):
+    path = str(tmp_path / "model.json")
+    umask = os.umask(0o022)
+    try:
+        checkpointer = Checkpointer(str(tmp_path / "checkpoints"))
+        checkpointer.save_model(NeuralNetwork(NEURON_COUNTS), path)
+        checkpointer.flush()
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+def test_delete_waits_for_pending_saves(tmp_path):
+    path = str(tmp_path / "model.json")
+    checkpointer = Checkpointer(str(tmp_path / "checkpoints"))
+    checkpointer.save_model(NeuralNetwork(NEURON_COUNTS), path)
+    checkpointer.delete_model(path)
+    checkpointer.flush()
+
+    assert not os.path.exists(path)
@@ -0,0 +1,26 @@
+import numpy as np
+from modelFile import ModelFile
+from modelRegistry import ModelRegistry
+from neuralNet import NeuralNetwork
+from scenario import create_road, generate_cars, load_brains
+
+def test_load_brains_mutates_every_agent_but_the_first(tmp_path):
+    path = str(tmp_path / "model.json")
+    neuron_counts = [5, 6, 4]
+    ModelFile.write_json(path, NeuralNetwork(neuron_counts).parameters, neuron_counts)
+    ModelRegistry.clear()
+
+    cars = generate_cars(3, create_road(), "AGENT")
+    load_brains(cars, path)
+    shared, _ = ModelRegistry.load(path)
+
+    # The first agent keeps referencing the read only parameters of the registry
+    assert cars[0].brain.parameters is shared
+    assert not cars[0].brain.parameters.flags.writeable
+
+    # Every other agent owns a private, mutated copy
+    for car in cars[1:]:
+        parameters = car.brain.parameters
+        assert parameters.flags.writeable
+        assert not np.shares_memory(parameters, shared)
+        assert not np.array_equal(parameters, shared)
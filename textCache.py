@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import pygame
+
+class TextCache:
+    """
+    Shares the fonts and rendered text of the user interface, so drawing a label costs a single blit instead of
+    loading a font and rendering the text again every frame. Fonts are kept per file and size, text surfaces per
+    font, size, text and color, and the least recently used surfaces are dropped once the cache is full
+
+    Attributes:
+        fonts (dict): The loaded fonts, keyed by font file and size
+        surfaces (OrderedDict): The rendered text keyed by font file, size, text and colors, the least recently used first
+        max_size (int): The amount of text surfaces kept at most
+    """
+
+    fonts = {}
+    surfaces = OrderedDict()
+    max_size = 256
+
+    def get_font(size, name=None):
+        """
+        Gets a font, loading it only the first time it is asked for
+
+        Args:
+            size (int): The size of the font
+            name (str): The font file; by default None for the default pygame font
+
+        Returns:
+            Font: The loaded font
+        """
+
+        key = (name, size)
+        font = TextCache.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            TextCache.fonts[key] = font
+        return font
+
+    def render(text, size, color, name=None, background=None):
+        """
+        Gets the antialiased surface of a text, rendering it only if it is not cached
+
+        Args:
+            text (str): The text to render
+            size (int): The size of the font
+            color (tuple): The color of the text (R, G, B)
+            name (str): The font file; by default None for the default pygame font
+            background (tuple): The color behind the text; by default None for a transparent background
+
+        Returns:
+            Surface: The rendered text, shared with every other caller so it must not be drawn on
+        """
+
+        key = (name, size, text, color, background)
+        surface = TextCache.surfaces.get(key)
+        if surface is not None:
+            TextCache.surfaces.move_to_end(key)
+            return surface
+
+        surface = TextCache.get_font(size, name).render(text, True, color, background)
+        TextCache.surfaces[key] = surface
+        while len(TextCache.surfaces) > TextCache.max_size:
+            TextCache.surfaces.popitem(last=False)
+        return surface
+
+    def clear():
+        """
+        Forgets every font and text surface, e.g. after pygame.font was quit
+        """
+
+        TextCache.fonts.clear()
+        TextCache.surfaces.clear()
@@ -0,0 +1,168 @@
+import copy
+import numpy as np
+from genome import Genome
+from scenario import create_road, generate_cars, generate_traffic, load_brains
+from neuralNet import NeuralNetwork
+from simulation import Simulation
+
+class Trainer:
+    """
+    Class that runs generation after generation on its own. A generation ends as soon as one of its rules applies,
+    then the best cars become the elites of the next generation and the rest of it is refilled with mutated copies of them
+
+    Args:
+        n (int): The amount of agent cars besides the first one, as passed to generate_cars; by default 50
+        model_path (str): Path of the json file the first generation loads; by default "model.json"
+        mutation (float): The amount by which the refilled agents are mutated; by default 0.2
+        elites (int): The amount of best cars carried over unchanged; by default 1
+        frame_budget (int): The amount of frames after which a generation ends; by default None for no limit
+        patience (int): The amount of frames without the best car getting further after which a generation ends; by default None for no limit
+        stop_when_damaged (bool): If a generation ends once every agent has crashed; by default True
+        batched (bool): If the simulation runs batched, see Simulation; by default True
+        checkpointer (Checkpointer): Saves the generations in the background when they end; by default None
+        profiler (FrameProfiler): Measures the phases of each simulation step; by default None
+        metrics (TrainingMetrics): Counts the simulated frames and agent steps; by default None
+
+    Attributes:
+        n (int): The amount of agent cars besides the first one
+        model_path (str): Path of the json file the first generation loads
+        mutation (float): The amount by which the refilled agents are mutated
+        elites (int): The amount of best cars carried over unchanged
+        frame_budget (int): The amount of frames after which a generation ends
+        patience (int): The amount of frames without progress after which a generation ends
+        stop_when_damaged (bool): If a generation ends once every agent has crashed
+        batched (bool): If the simulation runs batched
+        checkpointer (Checkpointer): Saves the generations in the background when they end
+        profiler (FrameProfiler): Measures the phases of each simulation step
+        metrics (TrainingMetrics): Counts the simulated frames and agent steps
+        generation (int): The number of the current generation
+        simulation (Simulation): The simulation of the current generation
+        parents (list): The networks of the elites of the last generation, empty before the first one ended
+        best_distance (float): The furthest distance the best car got in the current generation
+        stale_frames (int): The amount of frames since the best distance last grew
+        end_reason (str): Why the last generation ended, None before the first one ended
+    """
+
+    def __init__(self, n=50, model_path="model.json", mutation=0.2, elites=1, frame_budget=None, patience=None,
+                 stop_when_damaged=True, batched=True, checkpointer=None, profiler=None, metrics=None):
+        self.n = n
+        self.model_path = model_path
+        self.mutation = mutation
+        self.elites = elites
+        self.frame_budget = frame_budget
+        self.patience = patience
+        self.stop_when_damaged = stop_when_damaged
+        self.batched = batched
+        self.checkpointer = checkpointer
+        self.profiler = profiler
+        self.metrics = metrics
+
+        self.generation = 0
+        self.parents = []
+        self.end_reason = None
+        self.start_generation()
+
+    def start_generation(self):
+        """
+        Creates the simulation of the current generation. The first one loads the saved model like the game does,
+        the following ones start with the elites and fill up with mutated copies of them
+        """
+
+        road = create_road()
+        cars = generate_cars(self.n, road, "AGENT")
+
+        if not self.parents:
+            load_brains(cars, self.model_path)
+        else:
+            # One genome matrix holds the whole generation and every brain is a view of its row
+            neuron_counts = NeuralNetwork.get_neuron_counts(self.parents[0])
+            parents = np.stack([parent.parameters for parent in self.parents])
+            genomes = parents[np.arange(len(cars)) % len(parents)]
+            Genome.mutate(genomes[len(parents):], self.mutation)
+            for i in range(len(cars)):
+                cars[i].brain = NeuralNetwork(neuron_counts, genomes[i])
+
+        self.simulation = Simulation(road, cars, generate_traffic(road), self.batched, profiler=self.profiler)
+        self.best_distance = float('-inf')
+        self.stale_frames = 0
+
+    def step(self):
+        """
+        Advances the current generation by one frame and moves on to the next generation if it ended
+
+        Returns:
+            str: Why the generation ended, None if it goes on
+        """
+
+        agent_steps = self.simulation.agent_steps
+        self.simulation.step()
+        if self.metrics is not None:
+            self.metrics.update(self, self.simulation.agent_steps - agent_steps)
+
+        distance = self.simulation.get_best_distance()
+        if distance > self.best_distance:
+            self.best_distance = distance
+            self.stale_frames = 0
+        else:
+            self.stale_frames += 1
+
+        reason = self.get_end_reason()
+        if reason is not None:
+            self.end_generation(reason)
+        return reason
+
+    def get_end_reason(self):
+        """
+        Checks the rules that end a generation
+
+        Returns:
+            str: The rule that applies, None if the generation goes on
+        """
+
+        if self.stop_when_damaged and self.simulation.all_damaged():
+            return "all damaged"
+        if self.patience is not None and self.stale_frames >= self.patience:
+            return "no progress"
+        if self.frame_budget is not None and self.simulation.frame >= self.frame_budget:
+            return "frame budget"
+        return None
+
+    def end_generation(self, reason):
+        """
+        Keeps the networks of the best cars as parents and starts the next generation
+
+        Args:
+            reason (str): Why the generation ended
+        """
+
+        ranking = self.simulation.rank_cars().tolist()
+        self.parents = [copy.deepcopy(self.simulation.cars[i].brain) for i in ranking[:self.elites]]
+        self.end_reason = reason
+
+        if self.checkpointer is not None:
+            self.checkpointer.on_generation_end(self.generation, [self.simulation.cars[i].brain for i in ranking])
+
+        print(f"Generation {self.generation} ended after {self.simulation.frame} frames ({reason}), "
+              f"best distance {self.best_distance:.1f}")
+
+        self.generation += 1
+        self.start_generation()
+
+    def run_generation(self):
+        """
+        Runs the current generation until it ends, every step is a frame of the profiler
+
+        Returns:
+            Simulation: The finished simulation of the generation
+        """
+
+        simulation = self.simulation
+        profiler = self.profiler
+        while True:
+            if profiler is not None:
+                profiler.start_frame()
+            reason = self.step()
+            if profiler is not None:
+                profiler.end_frame()
+            if reason is not None:
+                return simulation
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 class Utils:
     """
@@ -81,3 +82,91 @@ class Utils:
                     return True
                 
         return False
+
+    def boxes_intersect(poly1, poly2):
+        """
+        Checks if two convex polygons, like the oriented rectangles of the cars, overlap.
+        First compares their axis aligned bounds and then uses the separating axis theorem: the polygons overlap
+        if there is no edge normal on which their projections are apart. Unlike polys_intersect this also
+        detects one polygon lying fully inside the other
+
+        Args:
+            poly1 (list): The first polygon
+            poly2 (list): The second polygon
+
+        Returns:
+            bool: True if the polygons overlap, else false
+        """
+
+        # Early out if the axis aligned bounds do not overlap
+        if (max(p["x"] for p in poly1) < min(p["x"] for p in poly2) or max(p["x"] for p in poly2) < min(p["x"] for p in poly1) or
+            max(p["y"] for p in poly1) < min(p["y"] for p in poly2) or max(p["y"] for p in poly2) < min(p["y"] for p in poly1)):
+            return False
+
+        for poly in (poly1, poly2):
+            for i in range(len(poly)):
+                # The normal of the edge is the axis the polygons are projected on
+                axis_x = poly[i]["y"] - poly[(i+1)%len(poly)]["y"]
+                axis_y = poly[(i+1)%len(poly)]["x"] - poly[i]["x"]
+
+                projection1 = [p["x"]*axis_x + p["y"]*axis_y for p in poly1]
+                projection2 = [p["x"]*axis_x + p["y"]*axis_y for p in poly2]
+                if max(projection1) < min(projection2) or max(projection2) < min(projection1):
+                    return False # Found a separating axis
+
+        return True
+
+    def boxes_intersect_any(poly, polys):
+        """
+        Batched form of boxes_intersect that checks one convex polygon against many at once
+
+        Args:
+            poly (array): The corner points of the polygon with shape (corners, 2)
+            polys (array): The corner points of the other polygons with shape (polygons, corners, 2)
+
+        Returns:
+            bool: True if the polygon overlaps any of the others, else false
+        """
+
+        return bool(Utils.boxes_overlap(poly, polys).any())
+
+    def boxes_overlap(poly, polys):
+        """
+        Checks one convex polygon against many at once using the axis aligned bounds and the separating axis theorem
+
+        Args:
+            poly (array): The corner points of the polygon with shape (corners, 2)
+            polys (array): The corner points of the other polygons with shape (polygons, corners, 2)
+
+        Returns:
+            array: For every other polygon True if it overlaps the polygon
+        """
+
+        poly = np.asarray(poly, dtype=np.float64)
+        polys = np.asarray(polys, dtype=np.float64)
+        overlap = np.zeros(len(polys), dtype=bool)
+        if len(polys) == 0:
+            return overlap
+
+        # Early out on the axis aligned bounds
+        lower, upper = poly.min(axis=0), poly.max(axis=0)
+        near = np.all((polys.min(axis=1) <= upper) & (polys.max(axis=1) >= lower), axis=1)
+        if not near.any():
+            return overlap
+        polys = polys[near]
+
+        # Edge normals of the polygon and of every other polygon, shape (polygons, axes, 2)
+        edges = np.roll(poly, -1, axis=0) - poly
+        other_edges = np.roll(polys, -1, axis=1) - polys
+        axes = np.concatenate((
+            np.broadcast_to(np.stack((-edges[:, 1], edges[:, 0]), axis=-1), (len(polys), len(poly), 2)),
+            np.stack((-other_edges[..., 1], other_edges[..., 0]), axis=-1)
+        ), axis=1)
+
+        # Project both polygons on every axis, shape (polygons, axes, corners)
+        projection = np.einsum('nad,cd->nac', axes, poly)
+        other_projection = np.einsum('nad,ncd->nac', axes, polys)
+        separated = (projection.max(axis=2) < other_projection.min(axis=2)) | (other_projection.max(axis=2) < projection.min(axis=2))
+
+        overlap[near] = ~separated.any(axis=1)
+        return overlap
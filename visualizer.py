@@ -1,12 +1,23 @@
+import math
 import pygame
+from textCache import TextCache
 from utils import Utils
 
 class Visualizer:
     """
-    Class responsible for visualizing the network during runtime by updating on every frame
+    Class responsible for visualizing the network during runtime by updating on every frame.
+    The background and the connections only change with the weights, so they are drawn once to a layer that is
+    reused until another network is drawn or the weights of the network change. Every frame only blits that layer
+    and paints the nodes in the colors of their current values, or only repaints the nodes whose values changed
+
+    Attributes:
+        cache (dict): The network, weight version and layout the layer was drawn for, the layer itself,
+            the positions of the nodes, the rendered output labels and the last painted node values
     """
 
-    def draw_network(screen, network, width, nn_screen_left):
+    cache = {}
+
+    def draw_network(screen, network, width, nn_screen_left, height=None, changed_only=False):
         """
         Draws the neural network 
 
@@ -15,17 +26,109 @@ class Visualizer:
             network (NeuralNetwork): The neural network which is going to be drawn
             width (int): The width of the screen for the visualization
             nn_screen_left (int): The starting point of the screen for the network
+            height (int): The height of the black background behind the network; by default None to use the screen height
+            changed_only (bool): If only the nodes whose values changed since the last call are repainted, relying on the
+                screen still showing the last drawing of the network; by default False
+
+        Returns:
+            list: The rectangles of the screen that were drawn on
+        """
+
+        layout = (screen.get_size(), width, nn_screen_left, height)
+        cache = Visualizer.cache
+        if cache.get('network') is not network or cache.get('version') != network.version or cache.get('layout') != layout:
+            cache = Visualizer.create_layer(screen, network, width, nn_screen_left, height)
+            Visualizer.cache = cache
+
+        # Collect the nodes in the order they are painted, from the output level down to the input level
+        nodes = []
+        for i in range(len(network.levels) - 1, -1, -1):
+            level = network.levels[i]
+            input_positions, output_positions = cache['nodes'][i]
+            nodes += [(position, value, False) for position, value in zip(input_positions, level.inputs)]
+            nodes += [(position, value, True) for position, value in zip(output_positions, level.outputs)]
+        values = [value for _, value, _ in nodes]
+        labels = cache['labels']
+
+        if changed_only and 'values' in cache:
+            # Only the nodes whose values changed are restored from the layer and painted again, along with every node sharing their place
+            changed = {tuple(Visualizer.get_node_rect(position)) for (position, value, _), old in zip(nodes, cache['values']) if value != old}
+            rects = [pygame.Rect(rect) for rect in changed]
+            for rect in rects:
+                screen.blit(cache['layer'], rect, rect.move(-cache['position'][0], -cache['position'][1]))
+            nodes = [node for node in nodes if Visualizer.get_node_rect(node[0]).collidelist(rects) != -1]
+            labels = [label for label in labels if label[1].collidelist(rects) != -1]
+        else:
+            rects = [screen.blit(cache['layer'], cache['position'])]
+        cache['values'] = values
+
+        node_radius = 18
+        for position, value, is_output in nodes:
+            if is_output:
+                # Draw the output nodes, including the hidden layers
+                pygame.draw.circle(screen, (0, 0, 0), position, node_radius*1.2)
+                pygame.draw.circle(screen, get_RGB(value), position, node_radius)
+            else:
+                # Draw the input nodes
+                pygame.draw.circle(screen, (0, 0, 0), position, node_radius)
+                pygame.draw.circle(screen, get_RGB(value), position, node_radius*0.8)
+
+        # Write the labels on the output nodes
+        for text_surface, text_rect in labels:
+            screen.blit(text_surface, text_rect)
+
+        return rects
+
+    def get_node_rect(position, node_radius=18):
+        """
+        Gets the rectangle covering everything drawn for the nodes at a position
+
+        Args:
+            position (tuple): The screen position of the node
+            node_radius (int): The radius of the nodes; by default 18
+
+        Returns:
+            Rect: The rectangle around the biggest circle of a node
         """
 
+        size = 2*math.ceil(node_radius*1.2) + 4
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = (int(position[0]), int(position[1]))
+        return rect
+
+    def create_layer(screen, network, width, nn_screen_left, height=None):
+        """
+        Draws the background and the connections of the network to a new layer and lays out its nodes and labels
+
+        Args:
+            screen (Surface): The surface the layer is going to be drawn on
+            network (NeuralNetwork): The neural network which is going to be drawn
+            width (int): The width of the screen for the visualization
+            nn_screen_left (int): The starting point of the screen for the network
+            height (int): The height of the black background behind the network; by default None to use the screen height
+
+        Returns:
+            dict: The cache entry of the network, see Visualizer.cache
+        """
+
+        layout = (screen.get_size(), width, nn_screen_left, height)
         margin = 50
         left = nn_screen_left + margin
         top = margin
         screen_width, screen_height = screen.get_size()
+        background = pygame.Rect(nn_screen_left, 0, width, screen_height if height is None else height)
+
+        # The layer starts at the whole pixel the background starts at, so every line lands on the same pixels as on the screen
+        layer = pygame.Surface(background.size)
+        layer.fill((0, 0, 0))
+        offset = background.topleft
         height = screen_height-margin*2
 
         # Determine level height
         level_height = height / len(network.levels)
 
+        nodes = [None for _ in network.levels]
+        labels = []
         for i in range(len(network.levels) - 1, -1, -1):
             # Determine level top by interpolating through the whole level hight
             level_top = top + Utils.lerp(
@@ -34,69 +137,84 @@ class Visualizer:
                     0.5 if len(network.levels) == 1 else i / (len(network.levels) - 1)
                 )
 
-            # Draw each level of the network
-            Visualizer.drawLevel(
-                screen,
+            # Draw the connections of each level of the network
+            nodes[i] = Visualizer.drawLevel(
+                layer,
                 network.levels[i],
                 left,
                 level_top,
                 width - margin*2,
                 level_height,
-                ['W','A','D','S'] if i == len(network.levels) - 1 else [])
+                offset)
+
+            if i == len(network.levels) - 1:
+                labels = Visualizer.create_labels(['W','A','D','S'], nodes[i][1], 18)
 
-    def drawLevel(screen, level, left, top, width, height, output_labels):
+        return {
+            'network': network,
+            'version': network.version,
+            'layout': layout,
+            'layer': layer,
+            'position': offset,
+            'nodes': nodes,
+            'labels': labels
+        }
+
+    def drawLevel(layer, level, left, top, width, height, offset):
         """
-        Draws the the nodes and lines of the specific level
+        Draws the lines of the specific level and lays out its nodes
 
         Args:
-            screen (Surface): The surface to draw the object on
+            layer (Surface): The layer to draw the lines on
             level (list): The level being drawn
             left (int): The starting node of each level on the furthest left
             top (int): The top of the current level
             width (int): The width of the screen for the visualization
             height (int): The height of the level 
-            output_labels (list): The labels of the output nodes (here being the letters of the control keys or nothing if the output node is on a hidden layer)
+            offset (tuple): The position of the layer on the screen
+
+        Returns:
+            list: The screen positions of the input nodes
+            list: The screen positions of the output nodes
         """
 
         right = left + width
         bottom = top + height
 
-        inputs, outputs, biases, weights = level.inputs, level.outputs, level.biases, level.weights
+        inputs, outputs, weights = level.inputs, level.outputs, level.weights
+        input_positions = [(Visualizer.get_node_X(inputs,i,left,right), bottom) for i in range(len(inputs))]
+        output_positions = [(Visualizer.get_node_X(outputs,j,left,right), top) for j in range(len(outputs))]
 
         # Draw all lines
-        for i in range(len(inputs)):  
-            for j in range(len(outputs)):  
-                start_pos = (Visualizer.get_node_X(inputs,i,left,right), bottom)
-                end_pos = (Visualizer.get_node_X(outputs,j,left,right), top)
-                draw_dashed_line(screen, get_RGB(weights[i][j]), start_pos, end_pos, 7, 3)
-        
-        node_radius=18
-        # Draw the input nodes
-        for i in range(len(inputs)):  
-            x = Visualizer.get_node_X(inputs,i,left,right);
-            
-            pygame.draw.circle(screen, (0, 0, 0), (x, bottom), node_radius)
-            pygame.draw.circle(screen, get_RGB(inputs[i]), (x, bottom), node_radius*0.8)
-        
-        # Draw the output nodes, including the hidden layers
-        for i in range(len(outputs)): 
-            x = Visualizer.get_node_X(outputs,i,left,right);
-            pygame.draw.circle(screen, (0, 0, 0), (x, top), node_radius*1.2)
-            pygame.draw.circle(screen, get_RGB(outputs[i]), (x, top), node_radius)
-            #pygame.draw.circle(screen, get_RGB(biases[i]), (x, top), node_radius)
-         
-            # Write the label on the output node
-            if output_labels and i < len(output_labels):
-                if output_labels[i]:
-                    font_size = round(node_radius*1.5)
-                    font = pygame.font.Font(None, font_size) 
-
-                    text = output_labels[i]
-                    text_surface = font.render(text, True, (0, 0, 0)) 
-
-                    text_rect = text_surface.get_rect()
-                    text_rect.center = (x, top)
-                    screen.blit(text_surface, text_rect)
+        for i, (start_x, start_y) in enumerate(input_positions):
+            for j, (end_x, end_y) in enumerate(output_positions):
+                start_pos = (start_x - offset[0], start_y - offset[1])
+                end_pos = (end_x - offset[0], end_y - offset[1])
+                draw_dashed_line(layer, get_RGB(weights[i][j]), start_pos, end_pos, 7, 3)
+
+        return input_positions, output_positions
+
+    def create_labels(output_labels, positions, node_radius):
+        """
+        Renders the labels of the output nodes
+
+        Args:
+            output_labels (list): The labels of the output nodes, here being the letters of the control keys
+            positions (list): The screen positions of the output nodes
+            node_radius (int): The radius of the nodes the label size is taken from
+
+        Returns:
+            list: The surface and the screen rectangle of every label
+        """
+
+        labels = []
+        for text, position in zip(output_labels, positions):
+            if text:
+                text_surface = TextCache.render(text, round(node_radius*1.5), (0, 0, 0))
+                text_rect = text_surface.get_rect()
+                text_rect.center = position
+                labels.append((text_surface, text_rect))
+        return labels
 
     def get_node_X(nodes, index, left, right):
         """